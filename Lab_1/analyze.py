@@ -0,0 +1,235 @@
+"""
+Batch replay analyzer for recorded games.
+
+Replays every game of one or more record files (see records.py) in worker processes and re-scores each
+position with a fixed-depth alpha-beta search: the value of the best move is compared with the value of the
+move that was played, and moves losing at least a threshold are flagged as blunders. Everything runs on the
+headless engine, so thousands of games are analyzed without a display.
+
+Values are in scoring() units from the point of view of the player who moved; a forced win is worth
+about search.WIN_SCORE.
+
+Usage:
+    python analyze.py <records_file> [<records_file> ...] [--depth N] [--threshold N] [--workers N]
+
+Example:
+    python arena.py alphabeta:time_limit_ms=50 random 200 --record games.txt
+    python analyze.py games.txt --depth 2
+"""
+
+import os
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import QuoridorGame
+from records import read_records, format_move, is_legal
+from search import AlphaBeta, INF, WIN_SCORE, MAX_PLY, race_value, from_tt
+
+DEFAULT_DEPTH = 2
+DEFAULT_THRESHOLD = 100
+GAMES_PER_TASK = 8  # Games sent to a worker at once, records are small and searches short
+
+# Per-process searcher of the analysis workers, created by the first game a worker analyzes
+worker_searchers = {}
+
+
+def searcher_for(size, depth):
+    """
+      Get the worker's fixed-depth searcher, keeping its transposition table between positions.
+      Boards of different sizes get their own searchers, their Zobrist keys are not comparable.
+
+      Parameters:
+      size (int): Board size.
+      depth (int): Search depth.
+
+      Returns:
+      AlphaBeta: The searcher, without time limit or opening book.
+      """
+    if (size, depth) not in worker_searchers:
+        worker_searchers[size, depth] = AlphaBeta(time_limit_ms=INF, max_depth=depth)
+    return worker_searchers[size, depth]
+
+
+def position_value(searcher, game, depth):
+    """
+      Score a position for the player on turn.
+
+      Parameters:
+      searcher (AlphaBeta): The searcher.
+      game (QuoridorGame): The position, it is restored before returning.
+      depth (int): Search depth, 0 for the static evaluation.
+
+      Returns:
+      tuple: (value, best move), the move is None without a search or when the game is over.
+      """
+    if game.is_over():
+        # The player who just moved has won
+        return -WIN_SCORE, None
+    if depth == 0:
+        # Decided races are scored exactly, like negamax does, not by the heuristic
+        race = game.solve_race()
+        if race is not None:
+            return race_value(game, race, 0), None
+        return searcher.evaluate(game), None
+    searcher.max_depth = depth
+    move = searcher.search(game)
+    return searcher.best_value, move
+
+
+def analyze_game(size, moves, depth=DEFAULT_DEPTH, threshold=DEFAULT_THRESHOLD):
+    """
+      Replay a game and score every move against the engine's choice.
+
+      Parameters:
+      size (int): Board size.
+      moves (list): The recorded moves.
+      depth (int): Search depth of the best move, the position after the played move is searched one ply less.
+      threshold (float): Loss from which a move counts as a blunder.
+
+      Returns:
+      dict: plies, error (None, or why the replay stopped) and per move: ply, player, move, best move,
+            best value, played value, loss and whether it is a blunder.
+      """
+    searcher = searcher_for(size, depth)
+    game = QuoridorGame(size=size)
+    scored = []
+    error = None
+    for ply, move in enumerate(moves):
+        if game.is_over() or not is_legal(game, move):
+            error = f"illegal move {format_move(move)} at ply {ply}"
+            break
+        best_value, best_move = position_value(searcher, game, depth)
+        player = game.current_turn
+        game.do_move(move)
+        if move == best_move:
+            played_value = best_value
+        else:
+            # Wins and races are scored from the position after the move, one ply further from this one
+            played_value = -from_tt(position_value(searcher, game, depth - 1)[0], 1)
+        loss = max(best_value - played_value, 0)
+        scored.append({
+            "ply": ply,
+            "player": player,
+            "move": format_move(move),
+            "best_move": format_move(best_move) if best_move is not None else None,
+            "best_value": best_value,
+            "played_value": played_value,
+            "loss": loss,
+            "blunder": loss >= threshold,
+        })
+    return {"plies": len(scored), "error": error, "moves": scored}
+
+
+def analyze_task(args):
+    """
+      Analyze a batch of games in a worker process.
+
+      Parameters:
+      args (tuple): (list of (game number, size, moves), depth, threshold).
+
+      Returns:
+      list: (game number, result of analyze_game) per game.
+      """
+    games, depth, threshold = args
+    return [(number, analyze_game(size, moves, depth, threshold)) for number, size, moves in games]
+
+
+def batches(paths, depth, threshold):
+    """
+      Read the record files and group their games into worker tasks.
+
+      Parameters:
+      paths (list): Record files.
+      depth (int): Search depth.
+      threshold (float): Blunder threshold.
+
+      Returns:
+      generator: Arguments of analyze_task.
+      """
+    batch = []
+    number = 0
+    for path in paths:
+        for size, moves in read_records(path):
+            batch.append((number, size, moves))
+            number += 1
+            if len(batch) == GAMES_PER_TASK:
+                yield batch, depth, threshold
+                batch = []
+    if batch:
+        yield batch, depth, threshold
+
+
+def analyze_records(paths, depth=DEFAULT_DEPTH, threshold=DEFAULT_THRESHOLD, workers=None):
+    """
+      Analyze all games of the record files in parallel worker processes.
+
+      Parameters:
+      paths (list): Record files.
+      depth (int): Search depth.
+      threshold (float): Blunder threshold.
+      workers (int): Number of worker processes, all CPUs if not given.
+
+      Returns:
+      dict: games, positions, blunders, errors, elapsed time, positions per second and the per-game results
+            as (game number, result of analyze_game) in file order.
+      """
+    started = time.perf_counter()
+    with ProcessPoolExecutor(workers or os.cpu_count() or 1) as pool:
+        results = [result for batch in pool.map(analyze_task, batches(paths, depth, threshold)) for result in batch]
+    elapsed = time.perf_counter() - started
+
+    positions = sum(result["plies"] for _, result in results)
+    return {
+        "games": len(results),
+        "positions": positions,
+        "blunders": sum(move["blunder"] for _, result in results for move in result["moves"]),
+        "errors": sum(result["error"] is not None for _, result in results),
+        "elapsed": elapsed,
+        "positions_per_second": positions / elapsed if elapsed else 0.0,
+        "results": results,
+    }
+
+
+def describe_value(value):
+    """
+      Format a value for the report, with forced wins and losses spelled out.
+
+      Parameters:
+      value (float): The value.
+
+      Returns:
+      str: The formatted value.
+      """
+    if value >= WIN_SCORE - MAX_PLY:
+        return "win"
+    if value <= -(WIN_SCORE - MAX_PLY):
+        return "loss"
+    return f"{value:.0f}"
+
+
+if __name__ == "__main__":
+    arguments = sys.argv[1:]
+    options = {"--depth": DEFAULT_DEPTH, "--threshold": DEFAULT_THRESHOLD, "--workers": None}
+    for option in options:
+        if option in arguments:
+            index = arguments.index(option)
+            options[option] = int(arguments[index + 1])
+            del arguments[index:index + 2]
+    if not arguments:
+        print("Usage: python analyze.py <records_file> [<records_file> ...] [--depth N] [--threshold N] [--workers N]")
+        sys.exit(1)
+
+    report = analyze_records(arguments, options["--depth"], options["--threshold"], options["--workers"])
+    for number, result in report["results"]:
+        if result["error"] is not None:
+            print(f"Game {number}: {result['error']}")
+        for move in result["moves"]:
+            if move["blunder"]:
+                print(f"Game {number}, ply {move['ply']}: player {move['player'] + 1} played {move['move']} "
+                      f"({describe_value(move['played_value'])}), best {move['best_move']} "
+                      f"({describe_value(move['best_value'])})")
+    print(f"{report['games']} games, {report['positions']} positions, {report['blunders']} blunders, "
+          f"{report['errors']} unreadable games")
+    print(f"Analyzed in {report['elapsed']:.1f} s ({report['positions_per_second']:.0f} positions/s)")
@@ -0,0 +1,258 @@
+"""
+Headless self-play arena for the Quoridor AIs.
+
+Two configured players meet for a number of games, played in parallel worker processes without any
+display. Colors alternate between games so both players get the first move equally often. For every game
+the arena records the winner, the number of plies and the think time of every move, and the summary reports
+win counts, game lengths, think times and the throughput in games per second. A player choosing an illegal
+move forfeits the game, so the recorded moves always replay to the game that was played.
+
+Players are described by picklable specs (name, settings), e.g. ("alphabeta", {"time_limit_ms": 100}),
+so they can be created inside the workers.
+
+Every game's moves are kept as well, and can be saved in a record file (see records.py) for analyze.py.
+With --instrument, the work of every AI move is counted (see instrumentation.py) and summarized per player.
+
+Usage:
+    python arena.py <player_a> <player_b> <games> [<workers>] [--record <records_file>] [--instrument]
+
+Example:
+    python arena.py alphabeta:time_limit_ms=100 mcts:playouts=200 20 4 --record games.txt
+"""
+
+import os
+import random
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import QuoridorGame, GRID_SIZE
+from instrumentation import Instrumentation, summarize, format_summary
+from mcts import MCTS
+from records import write_records, is_legal
+from search import AlphaBeta
+
+MAX_PLIES = 300  # Games longer than this are scored as draws
+
+
+class RandomPlayer:
+    """
+      Baseline player choosing uniformly among the possible moves.
+      """
+
+    def __init__(self, seed=None):
+        """
+          Create the player.
+
+          Parameters:
+          seed (int): Seed for reproducible games, random if not given.
+          """
+        self.rng = random.Random(seed)
+
+    def __call__(self, game):
+        """
+          Choose a random move.
+
+          Parameters:
+          game (QuoridorGame): The position.
+
+          Returns:
+          tuple: The chosen move.
+          """
+        return self.rng.choice(game.possible_moves())
+
+
+PLAYERS = {
+    "alphabeta": AlphaBeta,
+    "mcts": MCTS,
+    "random": RandomPlayer,
+}
+
+
+def make_player(spec):
+    """
+      Create a player from its spec.
+
+      Parameters:
+      spec (tuple): (name from PLAYERS, dict of constructor settings).
+
+      Returns:
+      callable: The player, taking a game and returning a move.
+      """
+    name, settings = spec
+    return PLAYERS[name](**settings)
+
+
+def parse_spec(text):
+    """
+      Parse a player spec given on the command line, e.g. "alphabeta:time_limit_ms=100,max_depth=6".
+
+      Parameters:
+      text (str): The spec.
+
+      Returns:
+      tuple: (name, settings) with numeric values converted.
+      """
+    name, _, options = text.partition(":")
+    settings = {}
+    for option in filter(None, options.split(",")):
+        key, value = option.split("=")
+        settings[key] = float(value) if "." in value else int(value)
+    return name, settings
+
+
+def play_game(specs, first, max_plies=MAX_PLIES, size=GRID_SIZE, instrument=False):
+    """
+      Play one game between two players.
+
+      Parameters:
+      specs (tuple): Specs of the two players.
+      first (int): Index of the spec that plays player 1 (moves first).
+      max_plies (int): Number of plies after which the game is a draw.
+      size (int): Board size.
+      instrument (bool): Whether to count the work of every move.
+
+      Returns:
+      dict: winner (spec index or None for a draw), forfeit (index of the spec that chose an illegal move and
+            lost, or None), plies, first, size, the moves played, think times of every move per spec and,
+            when instrumented, the instrumentation records of every move per spec.
+      """
+    seats = [first, 1 - first]
+    players = [make_player(specs[index]) for index in seats]
+    instrumentation = None
+    if instrument:
+        instrumentation = Instrumentation()
+        players = [instrumentation.wrap(player, index) for player, index in zip(players, seats)]
+        instrumentation.enable()
+    game = QuoridorGame(size=size)
+    think_times = ([], [])
+    moves = []
+    forfeit = None
+
+    while not game.is_over() and len(think_times[0]) + len(think_times[1]) < max_plies:
+        seat = game.current_turn
+        started = time.perf_counter()
+        move = players[seat](game)
+        think_times[seats[seat]].append(time.perf_counter() - started)
+        if move is None or not is_legal(game, move):
+            # make_move would only pass the turn, which a record cannot express: the player loses instead
+            forfeit = seats[seat]
+            break
+        game.do_move(move)
+        moves.append(move)
+
+    for player in players:
+        if hasattr(player, "close"):
+            player.close()
+    if instrumentation is not None:
+        instrumentation.disable()
+
+    winner = None
+    if forfeit is not None:
+        winner = 1 - forfeit
+    elif game.is_over():
+        winner = seats[0] if game.pawns[0][1] == size - 1 else seats[1]
+    return {
+        "winner": winner,
+        "forfeit": forfeit,
+        "plies": len(think_times[0]) + len(think_times[1]),
+        "first": first,
+        "size": size,
+        "moves": moves,
+        "think_times": think_times,
+        "instrumentation": tuple([move for move in instrumentation.moves if move["player"] == index]
+                                 for index in (0, 1)) if instrumentation is not None else None,
+    }
+
+
+def play_game_task(args):
+    """
+      Unpack the arguments of play_game, for ProcessPoolExecutor.map.
+
+      Parameters:
+      args (tuple): (specs, first, max_plies, size, instrument).
+
+      Returns:
+      dict: The result of play_game.
+      """
+    return play_game(*args)
+
+
+def run_arena(spec_a, spec_b, games, workers=None, max_plies=MAX_PLIES, size=GRID_SIZE, instrument=False):
+    """
+      Play a match between two players in parallel worker processes.
+
+      Parameters:
+      spec_a (tuple): Spec of the first player.
+      spec_b (tuple): Spec of the second player.
+      games (int): Number of games, colors alternate between games.
+      workers (int): Number of worker processes, all CPUs if not given.
+      max_plies (int): Number of plies after which a game is a draw.
+      size (int): Board size.
+      instrument (bool): Whether to count the work of every move, summarized per player.
+
+      Returns:
+      dict: Summary of the match and the list of game results.
+      """
+    specs = (spec_a, spec_b)
+    tasks = [(specs, game_index % 2, max_plies, size, instrument) for game_index in range(games)]
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(workers or os.cpu_count() or 1) as pool:
+        results = list(pool.map(play_game_task, tasks))
+    elapsed = time.perf_counter() - started
+
+    summary = {
+        "games": games,
+        "elapsed": elapsed,
+        "games_per_second": games / elapsed,
+        "draws": sum(result["winner"] is None for result in results),
+        "forfeits": sum(result["forfeit"] is not None for result in results),
+        "average_plies": sum(result["plies"] for result in results) / games,
+        "results": results,
+    }
+    for index, key in enumerate(("a", "b")):
+        times = [think for result in results for think in result["think_times"][index]]
+        summary["wins_" + key] = sum(result["winner"] == index for result in results)
+        summary["average_think_" + key] = sum(times) / len(times) if times else 0.0
+        summary["max_think_" + key] = max(times, default=0.0)
+        if instrument:
+            summary["instrumentation_" + key] = summarize(
+                [move for result in results for move in result["instrumentation"][index]])
+    return summary
+
+
+if __name__ == "__main__":
+    arguments = sys.argv[1:]
+    record_path = None
+    if "--record" in arguments:
+        index = arguments.index("--record")
+        record_path = arguments[index + 1]
+        del arguments[index:index + 2]
+    instrument = "--instrument" in arguments
+    if instrument:
+        arguments.remove("--instrument")
+    if len(arguments) not in (3, 4):
+        print("Usage: python arena.py <player_a> <player_b> <games> [<workers>] [--record <records_file>] "
+              "[--instrument]")
+        print("Example: python arena.py alphabeta:time_limit_ms=100 mcts:playouts=200 20 4")
+        sys.exit(1)
+
+    player_a, player_b = parse_spec(arguments[0]), parse_spec(arguments[1])
+    report = run_arena(player_a, player_b, int(arguments[2]), int(arguments[3]) if len(arguments) == 4 else None,
+                       instrument=instrument)
+    print(f"{arguments[0]} vs {arguments[1]}: {report['wins_a']} - {report['wins_b']} ({report['draws']} draws, "
+          f"{report['forfeits']} forfeits)")
+    print(f"Average game length: {report['average_plies']:.1f} plies")
+    print(f"Think time per move: A avg {report['average_think_a'] * 1000:.1f} ms, "
+          f"max {report['max_think_a'] * 1000:.1f} ms; B avg {report['average_think_b'] * 1000:.1f} ms, "
+          f"max {report['max_think_b'] * 1000:.1f} ms")
+    print(f"{report['games']} games in {report['elapsed']:.2f} s ({report['games_per_second']:.2f} games/s)")
+    if instrument:
+        for key, name in (("a", arguments[0]), ("b", arguments[1])):
+            print(f"Instrumentation of {name}:")
+            print(format_summary(report["instrumentation_" + key]))
+    if record_path is not None:
+        write_records(record_path, ((result["size"], result["moves"]) for result in report["results"]))
+        print(f"Games recorded in {record_path}")
@@ -0,0 +1,147 @@
+"""
+Background thinking for the AlphaBeta player.
+
+The search runs in a worker thread on its own copy of the game, so the window keeps drawing and handling
+events while the AI thinks. The thread reads the searcher's deadline at every node, which makes cancelling
+(pulling the deadline into the past) and extending a running search possible from the UI thread.
+
+With pondering enabled, the searcher keeps working while the human is on turn: it assumes the human plays
+the reply predicted by its principal variation and searches the position after it without a time limit.
+If the human plays that move, the running search becomes the real one and only gets the normal budget
+from that moment on, so everything it already searched is kept. Otherwise it is cancelled and a new search
+starts (the transposition table still holds what the ponder search found).
+"""
+
+import threading
+import time
+
+from engine import QuoridorGame
+from search import INF
+
+
+class BackgroundSearcher:
+    """
+      Runs an AlphaBeta searcher in a worker thread, with cancellation and optional pondering.
+      """
+
+    def __init__(self, searcher, ponder=False):
+        """
+          Create the background searcher.
+
+          Parameters:
+          searcher (AlphaBeta): The searcher to run.
+          ponder (bool): Whether to search the predicted reply while the opponent is on turn.
+          """
+        self.searcher = searcher
+        self.ponder_enabled = ponder
+        self.thread = None
+        self.lock = threading.Lock()
+        self.deadline = INF
+        self.move = None
+        self.ponder_key = None
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+
+    def run(self, game):
+        """
+          Search a position, the body of the worker thread.
+
+          Parameters:
+          game (QuoridorGame): Private copy of the position.
+          """
+        with self.lock:
+            self.searcher.deadline = self.deadline
+        self.move = self.searcher.deepen(game)
+
+    def launch(self, game, deadline):
+        """
+          Start a worker thread searching a copy of the position.
+
+          Parameters:
+          game (QuoridorGame): The position.
+          deadline (float): time.perf_counter() value at which the search stops.
+          """
+        self.move = None
+        self.deadline = deadline
+        copy = QuoridorGame.from_snapshot(game.snapshot())
+        self.thread = threading.Thread(target=self.run, args=(copy,), daemon=True)
+        self.thread.start()
+
+    def set_deadline(self, deadline):
+        """
+          Move the deadline of the running search.
+
+          Parameters:
+          deadline (float): The new time.perf_counter() deadline.
+          """
+        with self.lock:
+            self.deadline = deadline
+            self.searcher.deadline = deadline
+
+    def start(self, game):
+        """
+          Start thinking about the move of the player on turn. Returns immediately, use poll() for the result.
+
+          Parameters:
+          game (QuoridorGame): The position. It is not modified and may be changed once this returns.
+          """
+        if self.ponder_key is not None and self.ponder_key == game.zobrist:
+            # Ponder hit: the running search is already on this position, it just gets a time limit now
+            self.ponder_key = None
+            self.ponder_hits += 1
+            self.set_deadline(time.perf_counter() + self.searcher.time_limit)
+            return
+        if self.ponder_key is not None:
+            self.ponder_misses += 1
+        self.cancel()
+
+        if self.searcher.book is not None:
+            self.move = self.searcher.book.lookup(game)
+            if self.move is not None:
+                return
+        self.launch(game, time.perf_counter() + self.searcher.time_limit)
+
+    def poll(self):
+        """
+          Get the result of the search started by start() if it has finished.
+
+          Returns:
+          tuple: The chosen move, or None while the search is still running.
+          """
+        if self.ponder_key is not None or (self.thread is not None and self.thread.is_alive()):
+            return None
+        move, self.move, self.thread = self.move, None, None
+        return move
+
+    def ponder(self, game, move):
+        """
+          Start pondering after the AI has played a move, if pondering is enabled.
+
+          Parameters:
+          game (QuoridorGame): The position after the AI's move, with the opponent on turn.
+          move (tuple): The move the AI has just played.
+          """
+        if not self.ponder_enabled:
+            return
+        variation = self.searcher.principal_variation
+        if len(variation) < 2 or variation[0] != move or variation[1] not in game.possible_moves():
+            return
+        predicted = QuoridorGame.from_snapshot(game.snapshot())
+        predicted.do_move(variation[1])
+        if predicted.is_over():
+            return
+        if self.searcher.book is not None and self.searcher.book.probe(predicted.zobrist) is not None:
+            return
+        self.launch(predicted, INF)
+        self.ponder_key = predicted.zobrist
+
+    def cancel(self):
+        """
+          Stop the running search, if any, and wait for the worker thread to finish.
+          """
+        if self.thread is not None:
+            self.set_deadline(-INF)
+            self.thread.join()
+        self.thread = None
+        self.move = None
+        self.ponder_key = None
@@ -0,0 +1,568 @@
+"""
+Perft and speed benchmark suite for the Quoridor engine.
+
+A set of fixed reference positions is measured for:
+    - perft node counts (number of move sequences of each length), which check move generation,
+    - calls per second of possible_moves, available_moves_from_position, bfs, bfs_shortest_path and scoring,
+    - nodes per second of a fixed-depth alpha-beta search at several depths.
+
+Results are compared with a saved baseline: a perft count that differs is a correctness error, a rate
+that dropped by more than TOLERANCE is a performance regression. Either makes the script exit with status 1.
+Every rate is measured in several windows of about a second, each one right after a short window of a fixed
+pure-Python calibration loop. Rates are compared by their median ratio to the calibration rate, so a machine
+that is busier or slower than when the baseline was saved does not show up as a regression. The ratios still
+depend on the Python version, so the baseline should be saved with the interpreter the comparison runs on.
+
+With --verify, the incremental and batched parts of the engine are checked instead against plain
+cell-by-cell searches over the placed walls, in random games on several board sizes: the distance maps,
+the placeable mask, is_wall_valid (and its closes_loop shortcut), the wall pruning of possible_moves,
+Zobrist keys and undo, wall_impact_score and batch_bfs. Any mismatch makes the script exit with status 1.
+
+Usage:
+    python benchmark.py           # run and compare with the baseline
+    python benchmark.py --save    # run and save the results as the new baseline
+    python benchmark.py --tolerance 0.7    # compare with a looser limit on a very noisy machine
+    python benchmark.py --verify [<games>]    # check the engine against brute-force searches
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from engine import QuoridorGame, ORIENTATIONS, wall_impact, stack_boards, batch_bfs
+from search import AlphaBeta, INF
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+TOLERANCE = 0.5  # Allowed relative slowdown, above the window-to-window noise but failing any 2x slowdown
+MIN_TIME = 1.0  # Seconds of one measurement of a rate
+REPEATS = 3  # Measurements per rate, the median is kept to filter out noise from other processes
+CALIBRATION_TIME = 0.5  # Seconds of the calibration window before each measurement
+CALIBRATION_SIZE = 9  # Side of the grid flooded by the calibration loop
+# Positions have 20 to 70 moves with full-board wall generation, deeper trees would take minutes per run
+PERFT_DEPTH = 2
+SEARCH_DEPTHS = (2, 3)
+VERIFY_SIZES = (5, 9, 11)
+VERIFY_GAMES = 3  # Random games per board size checked by --verify
+VERIFY_WALL_RATE = 0.5  # Share of moves of the verification games that try a wall
+VERIFY_RACE_RATE = 0.5  # Share of the pawn moves stepping along the shortest path, to keep the games short
+VERIFY_MAX_PLIES = 150  # Verification games stop here, a broken engine may never let them end
+
+# Snapshots (pawns, walls, wall counts, current turn, previous positions, board size)
+REFERENCE_POSITIONS = {
+    "start": (((4, 0), (4, 8)), (), (10, 10), 0, [[], []], 9),
+    "opening": (((4, 2), (4, 6)), (((4, 3), "HORIZONTAL"), ((4, 6), "HORIZONTAL")), (9, 9), 0,
+                [[4, 1], [4, 7]], 9),
+    "midgame": (((3, 4), (5, 4)),
+                (((3, 5), "HORIZONTAL"), ((5, 4), "HORIZONTAL"), ((2, 3), "VERTICAL"), ((6, 4), "VERTICAL"),
+                 ((0, 6), "HORIZONTAL"), ((7, 2), "HORIZONTAL")),
+                (7, 7), 1, [[3, 3], [5, 5]], 9),
+    "endgame": (((6, 6), (2, 2)),
+                (((6, 7), "HORIZONTAL"), ((2, 2), "HORIZONTAL"), ((5, 5), "VERTICAL"), ((3, 0), "VERTICAL"),
+                 ((1, 7), "HORIZONTAL"), ((6, 1), "HORIZONTAL"), ((4, 3), "VERTICAL"), ((8, 4), "VERTICAL"),
+                 ((0, 4), "HORIZONTAL"), ((7, 4), "VERTICAL"), ((2, 5), "HORIZONTAL"), ((5, 1), "VERTICAL"),
+                 ((4, 8), "HORIZONTAL"), ((1, 2), "VERTICAL"), ((6, 3), "HORIZONTAL"), ((3, 6), "VERTICAL")),
+                (2, 2), 0, [[6, 5], [2, 3]], 9),
+}
+
+
+def perft(game, depth):
+    """
+      Count the move sequences of a given length from a position.
+
+      Parameters:
+      game (QuoridorGame): The position. It is restored before returning.
+      depth (int): Length of the sequences.
+
+      Returns:
+      int: The number of leaf nodes of the move tree.
+      """
+    if depth == 0 or game.is_over():
+        return 1
+    nodes = 0
+    for move in game.possible_moves():
+        game.do_move(move)
+        nodes += perft(game, depth - 1)
+        game.unmake_move(move)
+    return nodes
+
+
+def calls_per_second(function, min_time):
+    """
+      Call a function for a while and count the calls.
+
+      Parameters:
+      function (callable): Function without arguments.
+      min_time (float): Seconds to keep calling it.
+
+      Returns:
+      float: Calls per second.
+      """
+    calls = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        function()
+        calls += 1
+        elapsed = time.perf_counter() - started
+    return calls / elapsed
+
+
+def median(values):
+    """
+      Get the median of a list of numbers, the upper one of the middle pair for an even count.
+
+      Parameters:
+      values (list): The numbers.
+
+      Returns:
+      float: The median.
+      """
+    return sorted(values)[len(values) // 2]
+
+
+def rate(function, min_time=MIN_TIME, repeats=REPEATS):
+    """
+      Measure how many times per second a function can be called, and how that compares with the calibration
+      loop timed just before each measurement.
+
+      Parameters:
+      function (callable): Function without arguments.
+      min_time (float): Seconds to keep calling it in one measurement.
+      repeats (int): Number of measurements, the medians are returned.
+
+      Returns:
+      tuple: (calls per second, calls per calibration_loop run).
+      """
+    rates = []
+    relative = []
+    for _ in range(repeats):
+        calibration = calls_per_second(calibration_loop, CALIBRATION_TIME)
+        calls = calls_per_second(function, min_time)
+        rates.append(calls)
+        relative.append(calls / calibration)
+    return median(rates), median(relative)
+
+
+def calibration_loop(size=CALIBRATION_SIZE):
+    """
+      Flood an empty grid with a plain BFS, a fixed workload like the engine's that no engine change affects.
+
+      Parameters:
+      size (int): Side of the grid.
+
+      Returns:
+      int: Sum of the distances, so the work cannot be skipped.
+      """
+    dist = [-1] * (size * size)
+    dist[0] = 0
+    queue = [0]
+    for cell in queue:
+        x, y = cell % size, cell // size
+        for neighbour, inside in ((cell - size, y > 0), (cell + size, y < size - 1),
+                                  (cell - 1, x > 0), (cell + 1, x < size - 1)):
+            if inside and dist[neighbour] < 0:
+                dist[neighbour] = dist[cell] + 1
+                queue.append(neighbour)
+    return sum(dist)
+
+
+def search_from_scratch(searcher, game):
+    """
+      Search a position with an empty transposition table and history, so every run searches the same tree.
+
+      Parameters:
+      searcher (AlphaBeta): The searcher.
+      game (QuoridorGame): The position.
+      """
+    searcher.tt.clear()
+    searcher.history = {}
+    searcher.search(game)
+
+
+def benchmark_position(state):
+    """
+      Run the whole benchmark on one reference position.
+
+      Parameters:
+      state (tuple): Snapshot of the position.
+
+      Returns:
+      dict: perft counts per depth, search results, and per metric (perft nodes, calls, search nodes) the rate
+            per second and the rate relative to calibration_loop.
+      """
+    game = QuoridorGame.from_snapshot(state)
+    pawn = game.pawns[game.current_turn]
+    goal_row = game.size - 1 if game.current_turn == 0 else 0
+    results = {"perft": [], "rates": {}, "relative": {}, "search_nodes": {}}
+
+    def measure(metric, function, units=1):
+        calls, relative = rate(function)
+        results["rates"][metric] = units * calls
+        results["relative"][metric] = units * relative
+
+    results["perft"] = [perft(game, depth) for depth in range(1, PERFT_DEPTH + 1)]
+    measure("perft_nodes", lambda: perft(game, PERFT_DEPTH), results["perft"][-1])
+
+    measure("possible_moves", game.possible_moves)
+    measure("available_moves_from_position", lambda: game.available_moves_from_position(pawn))
+    measure("bfs", lambda: game.bfs(pawn, goal_row))
+    measure("bfs_shortest_path", lambda: game.bfs_shortest_path(pawn, goal_row))
+    measure("scoring", game.scoring)
+
+    for depth in SEARCH_DEPTHS:
+        searcher = AlphaBeta(time_limit_ms=INF, max_depth=depth)
+        search_from_scratch(searcher, game)
+        results["search_nodes"][str(depth)] = searcher.nodes
+        measure(f"search_depth_{depth}", lambda: search_from_scratch(searcher, game), searcher.nodes)
+
+    return results
+
+
+def run_benchmarks():
+    """
+      Benchmark every reference position.
+
+      Returns:
+      dict: Results of benchmark_position, keyed by position name.
+      """
+    return {name: benchmark_position(state) for name, state in REFERENCE_POSITIONS.items()}
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """
+      Compare benchmark results with a baseline.
+
+      Parameters:
+      results (dict): Results of run_benchmarks.
+      baseline (dict): Earlier results of run_benchmarks.
+      tolerance (float): Allowed relative slowdown of each rate, compared relative to the calibration loop.
+
+      Returns:
+      list: Descriptions of the perft mismatches and rate regressions, empty if everything passed.
+      """
+    problems = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]
+        if result["perft"] != expected["perft"]:
+            problems.append(f"{name}: perft {result['perft']} differs from baseline {expected['perft']}")
+        for metric, value in result["relative"].items():
+            old = expected.get("relative", {}).get(metric)
+            if old and value < old * (1 - tolerance):
+                problems.append(f"{name}: {metric} dropped by {(1 - value / old) * 100:.0f}% relative to the "
+                                f"calibration loop ({expected['rates'][metric]:.1f}/s in the baseline, "
+                                f"{result['rates'][metric]:.1f}/s now)")
+    return problems
+
+
+def print_results(results, baseline):
+    """
+      Print the results as a table, with the change against the baseline when available, relative to the
+      calibration loop like compare does.
+
+      Parameters:
+      results (dict): Results of run_benchmarks.
+      baseline (dict): Earlier results, may be empty.
+      """
+    for name, result in results.items():
+        print(f"{name}: perft {result['perft']}, search nodes {result['search_nodes']}")
+        for metric, value in result["rates"].items():
+            old = baseline.get(name, {}).get("relative", {}).get(metric)
+            change = f" ({(result['relative'][metric] / old - 1) * 100:+.0f}%)" if old else ""
+            print(f"    {metric:32} {value:12.1f}/s{change}")
+
+
+def closed_edges(game):
+    """
+      List the closed cell edges from the placed walls, without the engine's bitmasks.
+
+      Parameters:
+      game (QuoridorGame): The position.
+
+      Returns:
+      set: Closed edges as frozensets of the two (x, y) cells they separate.
+      """
+    closed = set()
+    for x, y in game.walls["VERTICAL"]:
+        for row in (y, y + 1):
+            closed.add(frozenset(((x - 1, row), (x, row))))
+    for x, y in game.walls["HORIZONTAL"]:
+        for column in (x, x + 1):
+            closed.add(frozenset(((column, y - 1), (column, y))))
+    return closed
+
+
+def wall_closed_edges(position, orientation):
+    """
+      List the cell edges closed by one wall.
+
+      Parameters:
+      position (tuple): The (x, y) grid coordinates of the wall.
+      orientation (str): The orientation of the wall ('VERTICAL' or 'HORIZONTAL').
+
+      Returns:
+      set: Closed edges as frozensets of the two (x, y) cells they separate.
+      """
+    x, y = position
+    if orientation == "VERTICAL":
+        return {frozenset(((x - 1, row), (x, row))) for row in (y, y + 1)}
+    return {frozenset(((column, y - 1), (column, y))) for column in (x, x + 1)}
+
+
+def brute_distances(size, closed, goal_row):
+    """
+      Compute the distance of every cell to a goal row with a plain BFS.
+
+      Parameters:
+      size (int): Board size.
+      closed (set): Closed edges, see closed_edges.
+      goal_row (int): The row to reach.
+
+      Returns:
+      dict: Distance per (x, y) cell, infinity where the goal row cannot be reached.
+      """
+    dist = {(x, y): INF for x in range(size) for y in range(size)}
+    queue = [(x, goal_row) for x in range(size)]
+    for cell in queue:
+        dist[cell] = 0
+    for x, y in queue:
+        for neighbour in ((x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y)):
+            if (neighbour in dist and dist[neighbour] == INF
+                    and frozenset(((x, y), neighbour)) not in closed):
+                dist[neighbour] = dist[x, y] + 1
+                queue.append(neighbour)
+    return dist
+
+
+def brute_wall_fits(game, position, orientation):
+    """
+      Check that a wall lies on the board and neither overlaps nor crosses a placed wall.
+
+      Parameters:
+      game (QuoridorGame): The position.
+      position (tuple): The (x, y) grid coordinates of the wall.
+      orientation (str): The orientation of the wall ('VERTICAL' or 'HORIZONTAL').
+
+      Returns:
+      bool: True if the wall fits.
+      """
+    x, y = position
+    if orientation == "VERTICAL":
+        if not (1 <= x < game.size and 0 <= y < game.size - 1):
+            return False
+        overlapping = {(x, y - 1), (x, y), (x, y + 1)}
+        crossing = (x - 1, y + 1)
+    else:
+        if not (0 <= x < game.size - 1 and 1 <= y < game.size):
+            return False
+        overlapping = {(x - 1, y), (x, y), (x + 1, y)}
+        crossing = (x + 1, y - 1)
+    other = "HORIZONTAL" if orientation == "VERTICAL" else "VERTICAL"
+    placed = {tuple(wall) for wall in game.walls[orientation]}
+    return not placed & overlapping and crossing not in {tuple(wall) for wall in game.walls[other]}
+
+
+def brute_pawn_distances(game, closed):
+    """
+      Compute both players' distances to their goal rows with plain BFS.
+
+      Parameters:
+      game (QuoridorGame): The position.
+      closed (set): Closed edges, see closed_edges.
+
+      Returns:
+      tuple: Distance of player 1 and of player 2.
+      """
+    return (brute_distances(game.size, closed, game.size - 1)[tuple(game.pawns[0])],
+            brute_distances(game.size, closed, 0)[tuple(game.pawns[1])])
+
+
+def verify_position(game):
+    """
+      Check the incremental state and the wall logic of a position against brute-force searches.
+
+      Parameters:
+      game (QuoridorGame): The position.
+
+      Returns:
+      list: Descriptions of the mismatches, empty if everything agreed.
+      """
+    problems = []
+    size = game.size
+    closed = closed_edges(game)
+
+    for player, goal_row in ((0, size - 1), (1, 0)):
+        expected = brute_distances(size, closed, goal_row)
+        dist = game.distance_maps[player].dist
+        if any(dist[y * size + x] != d for (x, y), d in expected.items()):
+            problems.append(f"distance map of player {player + 1} differs from BFS")
+    if game.zobrist != game.compute_zobrist():
+        problems.append("incremental Zobrist key differs from compute_zobrist()")
+
+    before = brute_pawn_distances(game, closed)
+    legal_walls = {}
+    for slot, (move_type, position) in enumerate(game.board.slot_moves):
+        orientation = move_type[len("WALL_"):]
+        fits = brute_wall_fits(game, position, orientation)
+        if bool(game.placeable >> slot & 1) != fits:
+            problems.append(f"placeable bit of {move_type} {position} is {not fits}")
+        after = brute_pawn_distances(game, closed | wall_closed_edges(position, orientation)) if fits else None
+        legal = fits and INF not in after
+        if game.is_wall_valid(position, orientation) != legal:
+            problems.append(f"is_wall_valid{position, orientation} should be {legal}")
+        if legal:
+            legal_walls[move_type, tuple(position)] = after
+
+    moves = game.possible_moves()
+    pawn_moves = [move[1] for move in moves if move[0] == "MOVE"]
+    if sorted(pawn_moves) != sorted(game.available_moves_from_position(game.pawns[game.current_turn])):
+        problems.append("pawn moves of possible_moves differ from available_moves_from_position")
+    wall_moves = {(move_type, tuple(position)) for move_type, position in moves if move_type != "MOVE"}
+    if len(wall_moves) != len(moves) - len(pawn_moves):
+        problems.append("possible_moves lists a wall twice")
+    if game.wall_counts[game.current_turn] > 0:
+        for wall in wall_moves - set(legal_walls):
+            problems.append(f"possible_moves lists the illegal wall {wall}")
+        for wall, after in legal_walls.items():
+            # Pruned walls must leave both distances unchanged
+            if wall not in wall_moves and after != before:
+                problems.append(f"possible_moves leaves out the wall {wall}, which changes a distance")
+    elif wall_moves:
+        problems.append("possible_moves lists walls without walls left")
+
+    expected_score = 0
+    for x in range(size - 1):
+        for y in range(size - 1):
+            for orientation in ORIENTATIONS:
+                after = legal_walls.get(("WALL_" + orientation, (x, y)))
+                if after is not None:
+                    expected_score += wall_impact(before[0], after[0], before[1], after[1])
+    if game.wall_impact_score() != expected_score:
+        problems.append(f"wall_impact_score {game.wall_impact_score()} differs from the per-slot sum {expected_score}")
+    return problems
+
+
+def verify_batch(games):
+    """
+      Check batch_bfs on a stack of positions of the same size against bfs_shortest_path.
+
+      Parameters:
+      games (list): QuoridorGame instances of the same size.
+
+      Returns:
+      list: Descriptions of the mismatches, empty if everything agreed.
+      """
+    problems = []
+    size = games[0].size
+    dist, pawn_distances = batch_bfs(*stack_boards(games))
+    for index, game in enumerate(games):
+        for player, goal_row in ((0, size - 1), (1, 0)):
+            expected = np.array([[game.bfs_shortest_path([x, y], goal_row) for x in range(size)]
+                                 for y in range(size)])
+            if not np.array_equal(dist[index, player], expected):
+                problems.append(f"batch_bfs board {index}: distance map of player {player + 1} differs")
+            if pawn_distances[index, player] != expected[game.pawns[player][1], game.pawns[player][0]]:
+                problems.append(f"batch_bfs board {index}: pawn distance of player {player + 1} differs")
+    return problems
+
+
+def random_move(game, rng):
+    """
+      Choose a random legal move, including walls pruned from possible_moves so every kind of position is reached.
+      Pawns often step along their shortest path, otherwise the games wander for hundreds of plies.
+
+      Parameters:
+      game (QuoridorGame): The position.
+      rng (random.Random): Source of randomness.
+
+      Returns:
+      tuple: The move.
+      """
+    moves = game.possible_moves()
+    if game.wall_counts[game.current_turn] > 0 and rng.random() < VERIFY_WALL_RATE:
+        move_type, position = rng.choice(game.board.slot_moves)
+        if game.is_wall_valid(position, move_type[len("WALL_"):]):
+            return move_type, position
+    if rng.random() < VERIFY_RACE_RATE:
+        return game.race_move()
+    return rng.choice(moves)
+
+
+def verify_engine(games=VERIFY_GAMES, sizes=VERIFY_SIZES, seed=0):
+    """
+      Play random games and check every position on the way forward and again while unmaking the moves.
+
+      Parameters:
+      games (int): Games per board size.
+      sizes (tuple): Board sizes.
+      seed (int): Seed of the random games.
+
+      Returns:
+      tuple: (number of positions checked, descriptions of the mismatches prefixed with the game and ply).
+      """
+    rng = random.Random(seed)
+    checked = 0
+    problems = []
+    for size in sizes:
+        positions = []
+        for number in range(games):
+            game = QuoridorGame(size=size)
+            played = []
+            snapshots = [game.snapshot()]
+            while not game.is_over() and len(played) < VERIFY_MAX_PLIES:
+                label = f"size {size} game {number} ply {len(played)}"
+                problems += [f"{label}: {problem}" for problem in verify_position(game)]
+                checked += 1
+                positions.append(QuoridorGame.from_snapshot(game.snapshot()))
+                move = random_move(game, rng)
+                game.do_move(move)
+                played.append(move)
+                snapshots.append(game.snapshot())
+
+            while played:
+                game.unmake_move(played.pop())
+                label = f"size {size} game {number} undo to ply {len(played)}"
+                if game.snapshot() != snapshots[len(played)]:
+                    problems.append(f"{label}: position differs from the one before the move")
+                problems += [f"{label}: {problem}" for problem in verify_position(game)]
+                checked += 1
+        problems += [f"size {size}: {problem}" for problem in verify_batch(positions)]
+    return checked, problems
+
+
+if __name__ == "__main__":
+    if "--verify" in sys.argv:
+        index = sys.argv.index("--verify")
+        games = int(sys.argv[index + 1]) if len(sys.argv) > index + 1 else VERIFY_GAMES
+        started = time.perf_counter()
+        checked, problems = verify_engine(games)
+        for problem in problems:
+            print("MISMATCH: " + problem)
+        print(f"{checked} positions checked in {time.perf_counter() - started:.1f} s, {len(problems)} mismatches")
+        sys.exit(1 if problems else 0)
+
+    save = "--save" in sys.argv[1:]
+    tolerance = float(sys.argv[sys.argv.index("--tolerance") + 1]) if "--tolerance" in sys.argv else TOLERANCE
+    baseline = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    results = run_benchmarks()
+    print_results(results, baseline)
+
+    if save:
+        with open(BASELINE_FILE, "w") as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+        print(f"Baseline saved to {BASELINE_FILE}")
+    else:
+        problems = compare(results, baseline, tolerance)
+        for problem in problems:
+            print("REGRESSION: " + problem)
+        if problems:
+            sys.exit(1)
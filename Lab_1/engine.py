@@ -0,0 +1,1466 @@
+"""
+Headless Quoridor engine.
+
+Holds the board representation, the game rules and the evaluation used by the AI. Nothing here
+depends on a display, so engines can be created in worker processes or on a server; the pygame
+window in game.py is only a client drawing an engine instance.
+
+Board representation:
+    - The board is size x size cells (9 x 9 in the standard game), and every table that depends on the size
+      is built once per size (BoardTables) and shared by all games on that board.
+    - Cells are indexed y * size + x and each one keeps a bitmask of its closed edges.
+    - Walls live in an occupancy mask of the 2 x (size - 1) ** 2 wall slots (128 bits on the standard board).
+    - Every move pushes a record of exactly what it changed on an undo stack, so unmake_move restores the
+      previous position in constant time at any search depth.
+"""
+
+import heapq
+import random
+
+from collections import deque
+
+import numpy as np
+
+from easyAI import TwoPlayerGame
+
+GRID_SIZE = 9  # Size of the standard board
+MAX_WALLS = 10  # Walls per player on the standard board
+INF = float('inf')
+
+# Edge bits of a cell's blocked mask
+UP, DOWN, LEFT, RIGHT = 1, 2, 4, 8
+DIRECTIONS = ((UP, 0, -1), (DOWN, 0, 1), (LEFT, -1, 0), (RIGHT, 1, 0))
+
+# Walls sit on the (size - 1) x (size - 1) lattice of inner intersections, vertical slots take the low half
+# of the occupancy mask and horizontal slots the high half (bits 0..63 and 64..127 on the standard board).
+WALL_GRID = GRID_SIZE - 1
+SLOTS_PER_ORIENTATION = WALL_GRID * WALL_GRID
+ORIENTATIONS = ("VERTICAL", "HORIZONTAL")
+
+
+def walls_for_size(size):
+    """
+       Get the number of walls per player on a board of the given size.
+
+       The standard 10 walls are scaled with the number of wall positions along a row, so the same share
+       of the board can be fenced off.
+
+       Parameters:
+       size (int): Number of cells along a side of the board.
+
+       Returns:
+       int: Walls per player.
+       """
+    return MAX_WALLS * (size - 1) // (GRID_SIZE - 1)
+
+
+def build_border_mask(size):
+    """
+       Build the blocked-edge mask of an empty board, where only the board edges are closed.
+
+       Parameters:
+       size (int): Number of cells along a side of the board.
+
+       Returns:
+       list: One bitmask per cell (index y * size + x).
+       """
+    border = []
+    for y in range(size):
+        for x in range(size):
+            mask = 0
+            if y == 0:
+                mask |= UP
+            if y == size - 1:
+                mask |= DOWN
+            if x == 0:
+                mask |= LEFT
+            if x == size - 1:
+                mask |= RIGHT
+            border.append(mask)
+    return border
+
+
+def build_wall_edges(size):
+    """
+       Precompute the four (cell, edge bit) pairs closed by every wall slot.
+
+       Parameters:
+       size (int): Number of cells along a side of the board.
+
+       Returns:
+       list: For each of the 2 * (size - 1) ** 2 slots, a tuple of (cell index, edge bit) pairs.
+       """
+    edges = []
+    for orientation in ORIENTATIONS:
+        for j in range(size - 1):
+            for i in range(size - 1):
+                top_left = j * size + i
+                if orientation == "VERTICAL":
+                    # Between columns i and i + 1, spanning rows j and j + 1
+                    edges.append(((top_left, RIGHT), (top_left + 1, LEFT),
+                                  (top_left + size, RIGHT), (top_left + size + 1, LEFT)))
+                else:
+                    # Between rows j and j + 1, spanning columns i and i + 1
+                    edges.append(((top_left, DOWN), (top_left + size, UP),
+                                  (top_left + 1, DOWN), (top_left + size + 1, UP)))
+    return edges
+
+
+def build_zobrist_keys(size, max_walls):
+    """
+       Draw the random 64-bit keys used to hash positions.
+
+       A fixed seed keeps the keys identical in every process, so hashes can be shared between workers
+       and stored on disk.
+
+       Parameters:
+       size (int): Number of cells along a side of the board.
+       max_walls (int): Walls per player.
+
+       Returns:
+       tuple: (pawn keys per player and cell, key per wall slot, keys per player and wall count, side-to-move key).
+       """
+    rng = random.Random(0x5155_4F52)
+    pawn_keys = [[rng.getrandbits(64) for _ in range(size * size)] for _ in range(2)]
+    wall_keys = [rng.getrandbits(64) for _ in range(2 * (size - 1) * (size - 1))]
+    count_keys = [[rng.getrandbits(64) for _ in range(max_walls + 1)] for _ in range(2)]
+    side_key = rng.getrandbits(64)
+    return pawn_keys, wall_keys, count_keys, side_key
+
+
+def wall_slot(position, orientation, size=GRID_SIZE):
+    """
+       Convert a wall position in move coordinates to its slot index.
+
+       A vertical wall at (x, y) stands on the left edge of column x and covers rows y and y + 1,
+       a horizontal wall at (x, y) stands on the top edge of row y and covers columns x and x + 1.
+
+       Parameters:
+       position (tuple): The (x, y) grid coordinates of the wall.
+       orientation (str): The orientation of the wall ('VERTICAL' or 'HORIZONTAL').
+       size (int): Number of cells along a side of the board.
+
+       Returns:
+       int: The slot index, or None if the wall does not fit on the board.
+       """
+    x, y = position
+    wall_grid = size - 1
+    if orientation == "VERTICAL":
+        i, j, base = x - 1, y, 0
+    else:
+        i, j, base = x, y - 1, wall_grid * wall_grid
+    if 0 <= i < wall_grid and 0 <= j < wall_grid:
+        return base + j * wall_grid + i
+    return None
+
+
+def wall_conflicts(slot, size=GRID_SIZE):
+    """
+       Get the wall slots that cannot be occupied together with the given one.
+
+       Parameters:
+       slot (int): The wall slot index.
+       size (int): Number of cells along a side of the board.
+
+       Returns:
+       int: Bitmask of the slot itself, its half-overlapping neighbours along the wall and the crossing wall.
+       """
+    wall_grid = size - 1
+    slots_per_orientation = wall_grid * wall_grid
+    i = slot % wall_grid
+    j = slot % slots_per_orientation // wall_grid
+    vertical = slot < slots_per_orientation
+    cross = slot + slots_per_orientation if vertical else slot - slots_per_orientation
+    conflicts = (1 << slot) | (1 << cross)
+    if vertical:
+        if j > 0:
+            conflicts |= 1 << (slot - wall_grid)
+        if j < wall_grid - 1:
+            conflicts |= 1 << (slot + wall_grid)
+    else:
+        if i > 0:
+            conflicts |= 1 << (slot - 1)
+        if i < wall_grid - 1:
+            conflicts |= 1 << (slot + 1)
+    return conflicts
+
+
+def wall_impact(p1_before, p1_after, p2_before, p2_after):
+    """
+       Score a wall by how much it lengthens the paths of both players.
+
+       Parameters:
+       p1_before (int): Distance of player 1 to the goal without the wall.
+       p1_after (int): Distance of player 1 to the goal with the wall.
+       p2_before (int): Distance of player 2 to the goal without the wall.
+       p2_after (int): Distance of player 2 to the goal with the wall.
+
+       Returns:
+       int: The score, positive values favour player 2.
+       """
+    score = 0
+    if p1_after > p1_before:
+        score += (p1_after - p1_before) * 5  # Penalize for harming player 1
+    if p2_after > p2_before:
+        score -= (p2_after - p2_before) * 10  # Reward for hindering player 2
+    return score
+
+
+def build_scoring_lanes(size, wall_edges, cell_steps):
+    """
+       Pack one board per wall slot rated by scoring() into a single big integer.
+
+       Lane k occupies bits [k * cells, (k + 1) * cells) and holds the board with the k-th wall closed.
+       Border cells never have an open edge leading off the board, so shifting a whole packed bitboard
+       never moves a bit from one lane into another.
+
+       Parameters:
+       size (int): Number of cells along a side of the board.
+       wall_edges (list): Result of build_wall_edges(size).
+       cell_steps (tuple): (edge bit, cell index step) of every direction.
+
+       Returns:
+       tuple: (slots of the lanes, integer with bit 0 of every lane set, closed cells per direction of cell_steps).
+       """
+    cells = size * size
+    slots = []
+    for x in range(size - 1):
+        for y in range(size - 1):
+            for orientation in ORIENTATIONS:
+                slot = wall_slot((x, y), orientation, size)
+                if slot is not None:
+                    slots.append(slot)
+
+    repeat = 0
+    closed = {edge: 0 for edge, _ in cell_steps}
+    for lane, slot in enumerate(slots):
+        offset = lane * cells
+        repeat |= 1 << offset
+        for cell, edge in wall_edges[slot]:
+            closed[edge] |= 1 << (offset + cell)
+    return slots, repeat, tuple(closed[edge] for edge, _ in cell_steps)
+
+
+def build_edge_slots(wall_edges):
+    """
+       Precompute which wall slots close each cell edge.
+
+       Parameters:
+       wall_edges (list): Result of build_wall_edges.
+
+       Returns:
+       dict: Bitmask of the slots closing the edge, keyed by (cell index, edge bit).
+       """
+    edge_slots = {}
+    for slot, edges in enumerate(wall_edges):
+        for cell, edge in edges:
+            edge_slots[cell, edge] = edge_slots.get((cell, edge), 0) | (1 << slot)
+    return edge_slots
+
+
+def build_wall_points(size):
+    """
+       Precompute the lattice points covered by every wall slot.
+
+       Walls run along the (size + 1) x (size + 1) lattice of cell corners, point (px, py) having index
+       py * (size + 1) + px. A wall covers its two end points and its middle point.
+
+       Parameters:
+       size (int): Number of cells along a side of the board.
+
+       Returns:
+       tuple: (indices of the end, middle and end point of every slot, barrier label of every point with 0 on
+               the board edge and -1 elsewhere, bitmask of the slots sharing a point with every slot).
+       """
+    stride = size + 1
+    slot_points = []
+    for orientation in ORIENTATIONS:
+        for j in range(size - 1):
+            for i in range(size - 1):
+                if orientation == "VERTICAL":
+                    points = [(i + 1, j + k) for k in range(3)]
+                else:
+                    points = [(i + k, j + 1) for k in range(3)]
+                slot_points.append(tuple(py * stride + px for px, py in points))
+
+    border_labels = [0 if px in (0, size) or py in (0, size) else -1 for py in range(stride) for px in range(stride)]
+
+    touching_slots = []
+    for points in slot_points:
+        touching = 0
+        for other, other_points in enumerate(slot_points):
+            if set(points) & set(other_points):
+                touching |= 1 << other
+        touching_slots.append(touching)
+    return slot_points, border_labels, touching_slots
+
+
+def closes_loop(labels, points):
+    """
+       Check whether a wall would join two points of the same barrier, closing a loop of walls and board edge.
+
+       Only such a wall can cut a region of the board off. Walls touching barriers at one point or not at all
+       (or touching different barriers, which they merely connect) leave every cell reachable as before.
+
+       Parameters:
+       labels (list): Barrier label of every lattice point, from QuoridorGame.wall_neighbourhood().
+       points (tuple): Indices of the wall's end, middle and end point.
+
+       Returns:
+       bool: True if the wall closes a loop.
+       """
+    end, middle, other_end = labels[points[0]], labels[points[1]], labels[points[2]]
+    return end >= 0 and (end == middle or end == other_end) or middle >= 0 and middle == other_end
+
+
+class BoardTables:
+    """
+      Lookup tables of one board size, built once by board_tables() and shared by every game of that size.
+      """
+
+    __slots__ = ("size", "cells", "wall_grid", "slots_per_orientation", "max_walls", "border_mask",
+                 "wall_edges", "zobrist_pawn", "zobrist_wall", "zobrist_count", "zobrist_side", "cell_steps",
+                 "edge_step", "lane_slots", "lane_repeat", "lane_closed", "edge_slots", "all_slots",
+                 "wall_conflicts", "wall_conflict_slots", "slot_points", "border_labels", "touching_slots",
+                 "slot_moves")
+
+    def __init__(self, size):
+        """
+          Build the tables.
+
+          Parameters:
+          size (int): Number of cells along a side of the board, odd so the pawns start in the middle column.
+          """
+        if size < 3 or size % 2 == 0:
+            raise ValueError(f"Board size must be an odd number of at least 3, got {size}")
+        self.size = size
+        self.cells = size * size
+        self.wall_grid = size - 1
+        self.slots_per_orientation = self.wall_grid * self.wall_grid
+        self.max_walls = walls_for_size(size)
+        self.border_mask = build_border_mask(size)
+        self.wall_edges = build_wall_edges(size)
+        self.zobrist_pawn, self.zobrist_wall, self.zobrist_count, self.zobrist_side = \
+            build_zobrist_keys(size, self.max_walls)
+        # (edge bit, cell index step) of every direction
+        self.cell_steps = ((UP, -size), (DOWN, size), (LEFT, -1), (RIGHT, 1))
+        self.edge_step = dict(self.cell_steps)
+        self.lane_slots, self.lane_repeat, self.lane_closed = build_scoring_lanes(size, self.wall_edges,
+                                                                                  self.cell_steps)
+        self.edge_slots = build_edge_slots(self.wall_edges)
+        slots = 2 * self.slots_per_orientation
+        self.all_slots = (1 << slots) - 1
+        self.wall_conflicts = [wall_conflicts(slot, size) for slot in range(slots)]
+        # Slots whose placeability has to be rechecked when a wall is removed, the removed slot included
+        self.wall_conflict_slots = [[other for other in range(slots) if conflicts >> other & 1]
+                                    for conflicts in self.wall_conflicts]
+        self.slot_points, self.border_labels, self.touching_slots = build_wall_points(size)
+        # Wall move of every slot, in the format of possible_moves()
+        self.slot_moves = [("WALL_VERTICAL", (slot % self.wall_grid + 1, slot // self.wall_grid))
+                           if slot < self.slots_per_orientation else
+                           ("WALL_HORIZONTAL", (slot % self.wall_grid,
+                                                (slot - self.slots_per_orientation) // self.wall_grid + 1))
+                           for slot in range(slots)]
+
+
+BOARD_TABLES = {}  # BoardTables per board size
+
+
+def board_tables(size=GRID_SIZE):
+    """
+      Get the lookup tables of a board size, building them on first use.
+
+      Parameters:
+      size (int): Number of cells along a side of the board.
+
+      Returns:
+      BoardTables: The shared tables.
+      """
+    if size not in BOARD_TABLES:
+        BOARD_TABLES[size] = BoardTables(size)
+    return BOARD_TABLES[size]
+
+
+class DistanceMap:
+    """
+      Distance from every cell to one goal row, kept up to date while walls are added and removed.
+
+      Adding a wall can only make distances grow and only for cells whose shortest paths all used one of
+      the four closed edges, so only those cells are recomputed. Removing a wall can only make distances
+      shrink, which is propagated outwards from the reopened edges.
+      """
+
+    def __init__(self, board, blocked, goal_row):
+        """
+          Build the distance field with a full BFS from the goal row.
+
+          Parameters:
+          board (BoardTables): Lookup tables of the board size.
+          blocked (list): The closed-edge masks of the board, shared with the game and read on every update.
+          goal_row (int): The row the player has to reach.
+          """
+        self.board = board
+        self.size = board.size
+        self.blocked = blocked
+        self.goal_row = goal_row
+        self.dist = []
+        self.rebuild()
+
+    def rebuild(self):
+        """
+          Recompute the whole distance field from scratch.
+          """
+        steps = self.board.cell_steps
+        blocked = self.blocked
+        dist = [INF] * (self.size * self.size)
+        queue = deque()
+        for cell in range(self.goal_row * self.size, (self.goal_row + 1) * self.size):
+            dist[cell] = 0
+            queue.append(cell)
+
+        while queue:
+            cell = queue.popleft()
+            for edge, step in steps:
+                if not blocked[cell] & edge:
+                    neighbour = cell + step
+                    if dist[neighbour] == INF:
+                        dist[neighbour] = dist[cell] + 1
+                        queue.append(neighbour)
+        self.dist = dist
+
+    def distance(self, position):
+        """
+          Get the distance from a position to the goal row.
+
+          Parameters:
+          position (list): The (x, y) grid position.
+
+          Returns:
+          int: The number of steps to the goal row, or infinity if it cannot be reached.
+          """
+        return self.dist[position[1] * self.size + position[0]]
+
+    def path_cut_slots(self, position):
+        """
+          Follow one shortest path from a position to the goal row and collect the wall slots crossing it.
+
+          A wall outside this mask leaves the path intact, so it can neither disconnect the position from the
+          goal nor make it farther away.
+
+          Parameters:
+          position (list): The (x, y) grid position.
+
+          Returns:
+          int: Bitmask of the wall slots that would cut the path.
+          """
+        steps = self.board.cell_steps
+        dist = self.dist
+        blocked = self.blocked
+        cell = position[1] * self.size + position[0]
+        if dist[cell] == INF:
+            return self.board.all_slots
+        cut = 0
+        while dist[cell] > 0:
+            for edge, step in steps:
+                if not blocked[cell] & edge and dist[cell + step] == dist[cell] - 1:
+                    cut |= self.board.edge_slots[cell, edge]
+                    cell += step
+                    break
+        return cut
+
+    def raised_by_wall(self, slot):
+        """
+          Compute which distances grow if the given wall slot gets closed.
+
+          The board itself is not modified: the four edges of the slot are treated as closed on top of the
+          current masks, so this works both for a wall being added and for a hypothetical one.
+
+          Parameters:
+          slot (int): The wall slot index.
+
+          Returns:
+          dict: New distances of the affected cells, keyed by cell index.
+          """
+        steps = self.board.cell_steps
+        dist = self.dist
+        blocked = self.blocked
+        closed = {}
+        for cell, edge in self.board.wall_edges[slot]:
+            closed[cell] = closed.get(cell, 0) | edge
+
+        # Cells that took one of the closed edges towards the goal may have lost their shortest path
+        heap = []
+        for cell, edge in self.board.wall_edges[slot]:
+            if dist[cell] != INF and dist[cell] == dist[cell + self.board.edge_step[edge]] + 1:
+                heapq.heappush(heap, (dist[cell], cell))
+        if not heap:
+            return {}
+
+        # Settle cells by increasing distance: a cell stays valid if a still valid neighbour one step
+        # closer to the goal is reachable through an open edge, otherwise its dependents are checked too
+        invalid = set()
+        while heap:
+            d, cell = heapq.heappop(heap)
+            if cell in invalid:
+                continue
+            mask = blocked[cell] | closed.get(cell, 0)
+            supported = False
+            for edge, step in steps:
+                if not mask & edge:
+                    neighbour = cell + step
+                    if dist[neighbour] == d - 1 and neighbour not in invalid:
+                        supported = True
+                        break
+            if supported:
+                continue
+            invalid.add(cell)
+            for edge, step in steps:
+                if not mask & edge:
+                    neighbour = cell + step
+                    if dist[neighbour] == d + 1:
+                        heapq.heappush(heap, (d + 1, neighbour))
+
+        # Recompute the invalidated cells from their valid borders
+        new_dist = {}
+        heap = []
+        for cell in invalid:
+            mask = blocked[cell] | closed.get(cell, 0)
+            best = INF
+            for edge, step in steps:
+                if not mask & edge:
+                    neighbour = cell + step
+                    if neighbour not in invalid and dist[neighbour] + 1 < best:
+                        best = dist[neighbour] + 1
+            new_dist[cell] = best
+            if best != INF:
+                heapq.heappush(heap, (best, cell))
+
+        while heap:
+            d, cell = heapq.heappop(heap)
+            if d > new_dist[cell]:
+                continue
+            mask = blocked[cell] | closed.get(cell, 0)
+            for edge, step in steps:
+                if not mask & edge:
+                    neighbour = cell + step
+                    if neighbour in invalid and d + 1 < new_dist[neighbour]:
+                        new_dist[neighbour] = d + 1
+                        heapq.heappush(heap, (d + 1, neighbour))
+
+        return new_dist
+
+    def distance_with_wall(self, slot, position):
+        """
+          Get the distance from a position to the goal row as if the given wall slot was closed.
+
+          Parameters:
+          slot (int): The wall slot index.
+          position (list): The (x, y) grid position.
+
+          Returns:
+          int: The number of steps to the goal row, or infinity if it cannot be reached.
+          """
+        cell = position[1] * self.size + position[0]
+        return self.raised_by_wall(slot).get(cell, self.dist[cell])
+
+    def wall_added(self, slot):
+        """
+          Update the distances after a wall slot has been closed.
+
+          Parameters:
+          slot (int): The wall slot index.
+          """
+        for cell, d in self.raised_by_wall(slot).items():
+            self.dist[cell] = d
+
+    def wall_removed(self, slot):
+        """
+          Update the distances after a wall slot has been reopened.
+
+          Parameters:
+          slot (int): The wall slot index.
+          """
+        steps = self.board.cell_steps
+        dist = self.dist
+        blocked = self.blocked
+        heap = []
+        for cell, edge in self.board.wall_edges[slot]:
+            through_edge = dist[cell + self.board.edge_step[edge]] + 1
+            if through_edge < dist[cell]:
+                dist[cell] = through_edge
+                heapq.heappush(heap, (through_edge, cell))
+
+        while heap:
+            d, cell = heapq.heappop(heap)
+            if d > dist[cell]:
+                continue
+            for edge, step in steps:
+                if not blocked[cell] & edge:
+                    neighbour = cell + step
+                    if d + 1 < dist[neighbour]:
+                        dist[neighbour] = d + 1
+                        heapq.heappush(heap, (d + 1, neighbour))
+
+
+def stack_boards(games):
+    """
+      Pack the walls and pawns of several games of the same size into the arrays taken by batch_bfs.
+
+      The wall occupancy bitmasks are unpacked with NumPy, a few bytes per board, instead of slot by slot.
+
+      Parameters:
+      games (list): QuoridorGame instances.
+
+      Returns:
+      tuple: (walls as a bool array of shape (boards, 2, size - 1, size - 1) indexed [board, orientation, j, i]
+              with vertical walls first, pawns as an int array of shape (boards, 2, 2) holding (x, y) per player).
+      """
+    board = games[0].board
+    slots = 2 * board.slots_per_orientation
+    width = (slots + 7) // 8
+    packed = np.frombuffer(b"".join(game.wall_bits.to_bytes(width, "little") for game in games), dtype=np.uint8)
+    walls = np.unpackbits(packed.reshape(len(games), width), axis=1, count=slots, bitorder="little").astype(bool)
+    walls = walls.reshape(len(games), 2, board.wall_grid, board.wall_grid)
+    pawns = np.array([game.pawns for game in games], dtype=np.int64).reshape(len(games), 2, 2)
+    return walls, pawns
+
+
+def batch_bfs(walls, pawns, size=None):
+    """
+      Compute both players' distance maps for a whole stack of boards at once.
+
+      Every board is flooded from both goal rows together, one vectorized frontier step per distance, so the
+      cost grows with the longest distance on any board instead of with the number of boards. The results
+      are those of QuoridorGame.bfs_shortest_path for every cell.
+
+      Parameters:
+      walls (numpy.ndarray): Wall slots of every board, bool array of shape (boards, 2, size - 1, size - 1)
+                             indexed [board, orientation, j, i] with vertical walls first (see stack_boards).
+                             Vertical wall (i, j) stands between columns i and i + 1 on rows j and j + 1,
+                             horizontal wall (i, j) between rows j and j + 1 on columns i and i + 1.
+      pawns (numpy.ndarray): Pawn positions, int array of shape (boards, 2, 2) holding (x, y) per player.
+      size (int): Number of cells along a side of the boards, taken from the shape of walls if not given.
+
+      Returns:
+      tuple: (distance maps as a float array of shape (boards, 2, size, size) indexed [board, player, y, x],
+              the distance of every cell to the player's goal row, infinity where it cannot be reached;
+              distances of the pawns as a float array of shape (boards, 2)).
+
+      Raises:
+      ValueError: If the arrays do not have the shapes above, or size does not match them.
+      """
+    walls = np.asarray(walls, dtype=bool)
+    pawns = np.asarray(pawns)
+    if walls.ndim != 4 or walls.shape[1] != 2 or walls.shape[2] != walls.shape[3] or walls.shape[2] < 2:
+        raise ValueError(f"walls must have shape (boards, 2, size - 1, size - 1), got {walls.shape}")
+    if size is None:
+        size = walls.shape[2] + 1
+    elif walls.shape[2] != size - 1:
+        raise ValueError(f"walls of shape {walls.shape} do not belong to a {size}x{size} board")
+    if pawns.shape != (walls.shape[0], 2, 2):
+        raise ValueError(f"pawns must have shape ({walls.shape[0]}, 2, 2), got {pawns.shape}")
+    if (pawns < 0).any() or (pawns >= size).any():
+        raise ValueError(f"pawn positions must lie on the {size}x{size} board")
+    boards = walls.shape[0]
+    vertical, horizontal = walls[:, 0], walls[:, 1]
+
+    # Closed edges: between rows y and y + 1 at column x, and between columns x and x + 1 on row y.
+    # Each wall closes the edge at its own position and the next one along its length.
+    horizontal = np.pad(horizontal, ((0, 0), (0, 0), (1, 1)))
+    closed_rows = (horizontal[:, :, 1:] | horizontal[:, :, :-1])[:, None]
+    vertical = np.pad(vertical, ((0, 0), (1, 1), (0, 0)))
+    closed_columns = (vertical[:, 1:, :] | vertical[:, :-1, :])[:, None]
+    open_rows, open_columns = ~closed_rows, ~closed_columns
+
+    dist = np.full((boards, 2, size, size), INF)
+    frontier = np.zeros((boards, 2, size, size), dtype=bool)
+    frontier[:, 0, size - 1, :] = True  # Player 1 goes down to the last row
+    frontier[:, 1, 0, :] = True  # Player 2 goes up to the first row
+    dist[frontier] = 0
+    reached = frontier.copy()
+
+    step = 1
+    while True:
+        spread = np.zeros_like(frontier)
+        spread[:, :, :-1, :] |= frontier[:, :, 1:, :] & open_rows
+        spread[:, :, 1:, :] |= frontier[:, :, :-1, :] & open_rows
+        spread[:, :, :, :-1] |= frontier[:, :, :, 1:] & open_columns
+        spread[:, :, :, 1:] |= frontier[:, :, :, :-1] & open_columns
+        spread &= ~reached
+        if not spread.any():
+            break
+        dist[spread] = step
+        reached |= spread
+        frontier = spread
+        step += 1
+
+    index = np.arange(boards)[:, None]
+    pawn_distances = dist[index, np.arange(2), pawns[:, :, 1], pawns[:, :, 0]]
+    return dist, pawn_distances
+
+
+class QuoridorGame(TwoPlayerGame):
+    """
+      The QuoridorGame class represents the Quoridor game logic, extending the TwoPlayerGame from easyAI.
+      """
+
+    __slots__ = ("size", "board", "pawns", "walls", "blocked", "wall_bits", "placeable", "path_cache", "wall_cache",
+                 "distance_maps", "wall_counts", "previous_position", "undo_stack", "current_turn", "zobrist")
+
+    def __init__(self, players=None, current_turn=0, size=GRID_SIZE):
+        """
+              Initialize the game with a list of players and set up the initial board state.
+
+              Parameters:
+              players (list): List of Human_Player or AI_Player instances, optional for headless use.
+              current_turn (int): Index of the player who moves first.
+              size (int): Number of cells along a side of the board, odd (9 for the standard game).
+              """
+        self.players = players if players is not None else [None, None]
+
+        self.size = size
+        self.board = board_tables(size)  # Lookup tables shared by all games of this size
+        middle = size // 2
+        self.pawns = [[middle, 0], [middle, size - 1]]  # Starting positions for player 1 and player 2
+        self.walls = {"VERTICAL": [], "HORIZONTAL": []}  # Grid positions, kept for drawing
+        self.blocked = list(self.board.border_mask)  # Closed edges of every cell
+        self.wall_bits = 0  # Occupancy of the 2 * (size - 1) ** 2 wall slots
+        self.placeable = self.board.all_slots  # Slots not conflicting with any placed wall
+        # Per player: ((wall_bits, pawn cell), slots cutting the current shortest path)
+        self.path_cache = [None, None]
+        # (wall_bits, barrier label of every lattice point, slots touching a placed wall)
+        self.wall_cache = None
+        # Distance-to-goal fields of player 1 and player 2, updated by add_wall and remove_wall
+        self.distance_maps = [DistanceMap(self.board, self.blocked, size - 1),
+                              DistanceMap(self.board, self.blocked, 0)]
+        self.wall_counts = [self.board.max_walls, self.board.max_walls]
+        self.previous_position = [[], []]
+        # One record per move made: (move type, player, pawn position or wall slot, previous position or
+        # wall orientation), with move type None for a turn passed by an invalid move
+        self.undo_stack = []
+        self.current_turn = current_turn
+        self.zobrist = self.compute_zobrist()  # Updated incrementally by every state change
+
+        self.current_player = current_turn + 1
+
+    def snapshot(self):
+        """
+          Describe the position with plain tuples and lists, small enough to send to worker processes.
+
+          Returns:
+          tuple: (pawns, walls as (position, orientation) pairs, wall counts, current turn,
+                  previous positions, board size). The undo stack is not included, moves made before cannot be unmade
+                  in the restored game.
+          """
+        walls = tuple((tuple(position), orientation)
+                      for orientation in ORIENTATIONS for position in self.walls[orientation])
+        return (tuple(tuple(pawn) for pawn in self.pawns), walls, tuple(self.wall_counts), self.current_turn,
+                [list(position) for position in self.previous_position], self.size)
+
+    @classmethod
+    def from_snapshot(cls, state, players=None):
+        """
+          Rebuild a game from the result of snapshot().
+
+          Parameters:
+          state (tuple): The snapshot.
+          players (list): Players of the new game, optional for headless use.
+
+          Returns:
+          QuoridorGame: The restored game.
+          """
+        pawns, walls, wall_counts, current_turn, previous_position, size = state
+        game = cls(players, current_turn, size)
+        for position, orientation in walls:
+            game.add_wall(wall_slot(position, orientation, game.size))
+            game.walls[orientation].append(tuple(position))
+        game.pawns = [list(pawn) for pawn in pawns]
+        game.wall_counts = list(wall_counts)
+        game.previous_position = [list(position) for position in previous_position]
+        game.zobrist = game.compute_zobrist()
+        return game
+
+    def compute_zobrist(self):
+        """
+          Compute the Zobrist hash of the position from scratch.
+
+          The hash covers the pawn positions, the placed walls, the remaining wall counts and the side to move.
+
+          Returns:
+          int: The 64-bit hash of the position.
+          """
+        key = 0
+        for player, (x, y) in enumerate(self.pawns):
+            key ^= self.board.zobrist_pawn[player][y * self.size + x]
+        for slot in range(2 * self.board.slots_per_orientation):
+            if self.wall_bits >> slot & 1:
+                key ^= self.board.zobrist_wall[slot]
+        for player, count in enumerate(self.wall_counts):
+            key ^= self.board.zobrist_count[player][count]
+        if self.current_turn:
+            key ^= self.board.zobrist_side
+        return key
+
+    def ttentry(self):
+        """
+          Get the key under which transposition tables store this position.
+
+          Returns:
+          int: The Zobrist hash of the position.
+          """
+        return self.zobrist
+
+    def switch_turn(self):
+        """
+                Switch to the next player's turn.
+                """
+        self.current_turn = 1 - self.current_turn
+        self.zobrist ^= self.board.zobrist_side
+
+    def move_pawn(self, player, position):
+        """
+          Put a player's pawn on a new position.
+
+          Parameters:
+          player (int): Index of the player.
+          position (list): The new (x, y) grid position.
+          """
+        x, y = self.pawns[player]
+        self.zobrist ^= self.board.zobrist_pawn[player][y * self.size + x]
+        self.zobrist ^= self.board.zobrist_pawn[player][position[1] * self.size + position[0]]
+        self.pawns[player] = position
+
+    def change_wall_count(self, player, delta):
+        """
+          Change the number of walls a player has left.
+
+          Parameters:
+          player (int): Index of the player.
+          delta (int): The change, -1 when a wall is placed and 1 when it is taken back.
+          """
+        count = self.wall_counts[player]
+        self.zobrist ^= self.board.zobrist_count[player][count] ^ self.board.zobrist_count[player][count + delta]
+        self.wall_counts[player] = count + delta
+
+    def is_move_blocked(self, start, end):
+        """
+                Check if a move from the start position to the end position is blocked by any walls.
+
+                Parameters:
+                start (list): Starting position of the pawn.
+                end (list): Ending position of the pawn.
+
+                Returns:
+                bool: True if the move is blocked, False otherwise.
+                """
+        x1, y1 = start
+        x2, y2 = end
+        blocked = self.blocked[y1 * self.size + x1]
+
+        if x1 == x2:
+            if y2 > y1:
+                return bool(blocked & DOWN)
+            elif y2 < y1:
+                return bool(blocked & UP)
+        elif y1 == y2:
+            if x2 > x1:
+                return bool(blocked & RIGHT)
+            elif x2 < x1:
+                return bool(blocked & LEFT)
+        return False
+
+    def available_moves_from_position(self, current_position):
+        """
+            Get a list of available moves from the given position.
+
+            Parameters:
+            current_position (list): The current position of the pawn.
+
+            Returns:
+            list: A list of valid moves (positions) that the pawn can move to.
+            """
+        x, y = current_position
+        blocked = self.blocked[y * self.size + x]
+        moves = []
+
+        for edge, dx, dy in DIRECTIONS:
+            if not blocked & edge:
+                moves.append([x + dx, y + dy])
+
+        return moves
+
+    def bfs(self, start_pos, goal_row):
+        """
+               Use breadth-first search (BFS) to check if there is a valid path from start_pos to goal_row.
+
+               Parameters:
+               start_pos (list): The starting position of the pawn.
+               goal_row (int): The row to reach (size - 1 for Player 1, 0 for Player 2).
+
+               Returns:
+               bool: True if there is a path to the goal row, False otherwise.
+               """
+        start = start_pos[1] * self.size + start_pos[0]
+        goal_start = goal_row * self.size
+        queue = deque([start])
+        visited = 1 << start
+        blocked = self.blocked
+        steps = self.board.cell_steps
+
+        while queue:
+            cell = queue.popleft()
+
+            if goal_start <= cell < goal_start + self.size:
+                return True
+
+            for edge, step in steps:
+                if not blocked[cell] & edge:
+                    neighbour = cell + step
+                    if not visited >> neighbour & 1:
+                        visited |= 1 << neighbour
+                        queue.append(neighbour)
+
+        return False
+
+    def bfs_shortest_path(self, start, goal_row):
+        """
+               Find the shortest path from start to the goal_row using BFS.
+
+               Parameters:
+               start (list): The starting position of the pawn.
+               goal_row (int): The row to reach.
+
+               Returns:
+               int: The shortest distance to the goal_row, or infinity if no path exists.
+               """
+        start_cell = start[1] * self.size + start[0]
+        goal_start = goal_row * self.size
+        queue = deque([(start_cell, 0)])
+        visited = 1 << start_cell
+        blocked = self.blocked
+        steps = self.board.cell_steps
+
+        while queue:
+            cell, dist = queue.popleft()
+            if goal_start <= cell < goal_start + self.size:
+                return dist
+
+            for edge, step in steps:
+                if not blocked[cell] & edge:
+                    neighbour = cell + step
+                    if not visited >> neighbour & 1:
+                        visited |= 1 << neighbour
+                        queue.append((neighbour, dist + 1))
+
+        return float('inf')
+
+    def is_path_to_goal(self):
+        """
+         Check if both players have a valid path to their respective goal rows.
+
+         Returns:
+         bool: True if both players can reach their goal row without being blocked, False otherwise.
+         """
+        if not self.bfs(self.pawns[0], self.size - 1):
+            return False
+
+        if not self.bfs(self.pawns[1], 0):
+            return False
+
+        return True
+
+    def add_wall(self, slot):
+        """
+          Close the four cell edges covered by a wall slot and mark the slot as occupied.
+
+          Parameters:
+          slot (int): The wall slot index.
+          """
+        self.wall_bits |= 1 << slot
+        self.placeable &= ~self.board.wall_conflicts[slot]
+        self.zobrist ^= self.board.zobrist_wall[slot]
+        for cell, edge in self.board.wall_edges[slot]:
+            self.blocked[cell] |= edge
+        for distance_map in self.distance_maps:
+            distance_map.wall_added(slot)
+
+    def remove_wall(self, slot):
+        """
+          Reopen the four cell edges covered by a wall slot and free the slot.
+
+          Walls never overlap, so every edge of the slot is closed by this wall only.
+
+          Parameters:
+          slot (int): The wall slot index.
+          """
+        self.wall_bits &= ~(1 << slot)
+        for other in self.board.wall_conflict_slots[slot]:
+            if not self.wall_bits & self.board.wall_conflicts[other]:
+                self.placeable |= 1 << other
+        self.zobrist ^= self.board.zobrist_wall[slot]
+        for cell, edge in self.board.wall_edges[slot]:
+            self.blocked[cell] &= ~edge
+        for distance_map in self.distance_maps:
+            distance_map.wall_removed(slot)
+
+    def is_wall_valid(self, position, orientation):
+        """
+          Check if a wall placement is valid based on several criteria:
+          1. Wall must be within the grid boundaries.
+          2. Wall must not overlap with existing walls of the same orientation.
+          3. Wall must not cross a wall of the opposite orientation.
+          4. Wall must not block all paths to the goal for either player.
+
+          Parameters:
+          position (tuple): The (x, y) grid coordinates of the wall.
+          orientation (str): The orientation of the wall ('VERTICAL' or 'HORIZONTAL').
+
+          Returns:
+          bool: True if the wall placement is valid, False otherwise.
+          """
+        slot = wall_slot(position, orientation, self.size)
+        if slot is None:
+            return False
+
+        # Overlaps and crossings with placed walls are tracked by the placeable mask
+        if not self.placeable >> slot & 1:
+            return False
+
+        return self.wall_keeps_paths(slot)
+
+    def wall_neighbourhood(self):
+        """
+          Group the placed walls into connected barriers and find the slots next to them, cached until a wall
+          changes.
+
+          Returns:
+          tuple: (barrier label of every lattice point: equal labels for connected points, 0 for the board edge
+                  and the walls touching it, -1 for free points; bitmask of the slots sharing a point with a
+                  placed wall).
+          """
+        cached = self.wall_cache
+        if cached is None or cached[0] != self.wall_bits:
+            labels = list(self.board.border_labels)
+            next_label = 1
+            near = 0
+            bits = self.wall_bits
+            while bits:
+                low = bits & -bits
+                slot = low.bit_length() - 1
+                bits ^= low
+                points = self.board.slot_points[slot]
+                near |= self.board.touching_slots[slot]
+                touched = {labels[point] for point in points if labels[point] >= 0}
+                if not touched:
+                    label = next_label
+                    next_label += 1
+                else:
+                    # The wall joins the barriers it touches, relabel them all
+                    label = min(touched)
+                    if len(touched) > 1:
+                        labels = [label if old in touched else old for old in labels]
+                for point in points:
+                    labels[point] = label
+            cached = (self.wall_bits, labels, near)
+            self.wall_cache = cached
+        return cached[1], cached[2]
+
+    def wall_keeps_paths(self, slot, labels=None):
+        """
+          Check that a free wall slot leaves both players a path to their goal row.
+
+          A wall can only close a region off if it completes a loop of walls and board edge (closes_loop).
+          Such walls are then checked against both players' distance maps, and only if they cut the player's
+          current shortest path. This is the path test of every wall legality check, is_wall_valid and
+          possible_moves both go through it.
+
+          Parameters:
+          slot (int): A slot not conflicting with any placed wall.
+          labels (list): Barrier labels of wall_neighbourhood(), looked up if not given.
+
+          Returns:
+          bool: True if both players can still reach their goal row with the wall placed.
+          """
+        if labels is None:
+            labels, _ = self.wall_neighbourhood()
+        if not closes_loop(labels, self.board.slot_points[slot]):
+            return True
+        return not self.wall_seals_off(slot)
+
+    def wall_seals_off(self, slot):
+        """
+          Check with the distance maps whether a wall slot would cut a player off from their goal row.
+
+          Parameters:
+          slot (int): A slot not conflicting with any placed wall.
+
+          Returns:
+          bool: True if either player could no longer reach their goal row with the wall placed.
+          """
+        for player, distance_map in enumerate(self.distance_maps):
+            if self.path_cut_slots(player) >> slot & 1:
+                if distance_map.distance_with_wall(slot, self.pawns[player]) == INF:
+                    return True
+
+        return False
+
+    def path_cut_slots(self, player):
+        """
+          Get the wall slots crossing the player's current shortest path, cached until a wall or the pawn moves.
+
+          Parameters:
+          player (int): Index of the player.
+
+          Returns:
+          int: Bitmask of the wall slots that would cut the path.
+          """
+        x, y = self.pawns[player]
+        key = (self.wall_bits, y * self.size + x)
+        cached = self.path_cache[player]
+        if cached is None or cached[0] != key:
+            cached = (key, self.distance_maps[player].path_cut_slots(self.pawns[player]))
+            self.path_cache[player] = cached
+        return cached[1]
+
+    def possible_moves(self):
+        """
+              Get the list of possible moves for the current player.
+
+              Walls are generated over the whole board but pruned to the slots that matter: those crossing
+              either player's shortest path (the only walls that change a distance) and those next to a placed
+              wall (which extend or close off existing barriers). Every other legal wall is still accepted by
+              make_move and place_wall.
+
+              Returns:
+              list: A list of valid moves for the current player.
+              """
+        moves = []
+
+        current_pawn_pos = self.pawns[self.current_turn]
+        pawn_moves = self.available_moves_from_position(current_pawn_pos)
+        for move in pawn_moves:
+            moves.append(('MOVE', move))
+
+        if self.wall_counts[self.current_turn] > 0:
+            labels, near = self.wall_neighbourhood()
+            candidates = self.placeable & (self.path_cut_slots(0) | self.path_cut_slots(1) | near)
+            slot_moves = self.board.slot_moves
+            while candidates:
+                low = candidates & -candidates
+                slot = low.bit_length() - 1
+                candidates ^= low
+                if self.wall_keeps_paths(slot, labels):
+                    moves.append(slot_moves[slot])
+
+        return moves
+
+    def move_gain(self, move):
+        """
+          Measure how much a move improves the race to the goal for the player on turn, used to order moves.
+
+          A pawn move gains the steps it saves on the player's shortest path. A wall gains the steps it adds
+          to the opponent's shortest path minus the steps it adds to the player's own. Walls that do not cross
+          a shortest path add nothing, so the distance is only recomputed for walls that do.
+
+          Parameters:
+          move (tuple): A move from possible_moves().
+
+          Returns:
+          int: The gain in steps, negative for moves that lose ground.
+          """
+        player = self.current_turn
+        move_type, move_data = move
+        if move_type == 'MOVE':
+            distance_map = self.distance_maps[player]
+            return distance_map.distance(self.pawns[player]) - distance_map.distance(move_data)
+
+        slot = wall_slot(move_data, move_type[len('WALL_'):], self.size)
+        gain = 0
+        for side, sign in ((1 - player, 1), (player, -1)):
+            if self.path_cut_slots(side) >> slot & 1:
+                distance_map = self.distance_maps[side]
+                pawn = self.pawns[side]
+                gain += sign * (distance_map.distance_with_wall(slot, pawn) - distance_map.distance(pawn))
+        return gain
+
+    def evaluate_wall_impact(self, position, orientation):
+        """
+          Evaluate the strategic value of placing a wall by comparing
+          the distances of both players to their goals before and after
+          the wall is placed.
+
+          Parameters:
+          position (tuple): The (x, y) grid coordinates of the wall.
+          orientation (str): The orientation of the wall ('VERTICAL' or 'HORIZONTAL').
+
+          Returns:
+          int: The score reflecting the strategic impact of placing the wall.
+               Positive values indicate a disadvantage for Player 1, while
+               negative values indicate an advantage for Player 2.
+          """
+        slot = wall_slot(position, orientation, self.size)
+        p1_map, p2_map = self.distance_maps
+
+        p1_dist_before = p1_map.distance(self.pawns[0])
+        p2_dist_before = p2_map.distance(self.pawns[1])
+        p1_dist_after = p1_map.distance_with_wall(slot, self.pawns[0])
+        p2_dist_after = p2_map.distance_with_wall(slot, self.pawns[1])
+
+        return wall_impact(p1_dist_before, p1_dist_after, p2_dist_before, p2_dist_after)
+
+    def open_bitboards(self):
+        """
+          Get the cells with an open edge in each direction as bitboards with one bit per cell.
+
+          Returns:
+          tuple: One bitboard per direction, in the order of the board's cell_steps.
+          """
+        boards = [0, 0, 0, 0]
+        steps = self.board.cell_steps
+        for cell, mask in enumerate(self.blocked):
+            bit = 1 << cell
+            for index, (edge, _) in enumerate(steps):
+                if not mask & edge:
+                    boards[index] |= bit
+        return tuple(boards)
+
+    def distances_with_each_wall(self, start, goal_row, open_boards=None):
+        """
+          Compute the distance from start to the goal row on every board of the lane_slots table at once.
+
+          All boards are flooded together, one bit-parallel BFS step per distance, on a packed bitboard
+          holding one lane per wall slot. A lane stops as soon as its front touches the goal row.
+
+          Parameters:
+          start (list): The starting position of the pawn.
+          goal_row (int): The row to reach.
+          open_boards (tuple): Result of open_bitboards(), computed if not given.
+
+          Returns:
+          list: Distance per lane, infinity where the wall seals the pawn off.
+          """
+        cells = self.size * self.size
+        if open_boards is None:
+            open_boards = self.open_bitboards()
+        up, down, left, right = [(board * self.board.lane_repeat) & ~closed
+                                 for board, closed in zip(open_boards, self.board.lane_closed)]
+        goal = (((1 << self.size) - 1) << (goal_row * self.size)) * self.board.lane_repeat
+        lane_bits = (1 << cells) - 1
+
+        distances = [INF] * len(self.board.lane_slots)
+        frontier = reached = (1 << (start[1] * self.size + start[0])) * self.board.lane_repeat
+        dist = 0
+        while frontier:
+            hit = frontier & goal
+            while hit:
+                lane = ((hit & -hit).bit_length() - 1) // cells
+                distances[lane] = dist
+                finished = ~(lane_bits << (lane * cells))
+                hit &= finished
+                frontier &= finished
+            frontier = (((frontier & up) >> self.size) | ((frontier & down) << self.size)
+                        | ((frontier & left) >> 1) | ((frontier & right) << 1)) & ~reached
+            reached |= frontier
+            dist += 1
+        return distances
+
+    def wall_impact_score(self):
+        """
+          Sum the impact of every valid wall slot rated by scoring(), evaluated in one batched pass.
+
+          Equivalent to calling is_wall_valid and evaluate_wall_impact for each slot, but both players'
+          distances for all slots come from two bit-parallel searches.
+
+          Returns:
+          int: The summed wall impact, positive values favour player 2.
+          """
+        open_boards = self.open_bitboards()
+        p1_after = self.distances_with_each_wall(self.pawns[0], self.size - 1, open_boards)
+        p2_after = self.distances_with_each_wall(self.pawns[1], 0, open_boards)
+        p1_before = self.distance_maps[0].distance(self.pawns[0])
+        p2_before = self.distance_maps[1].distance(self.pawns[1])
+
+        placeable = self.placeable
+        score = 0
+        for lane, slot in enumerate(self.board.lane_slots):
+            if not placeable >> slot & 1 or p1_after[lane] == INF or p2_after[lane] == INF:
+                continue
+            score += wall_impact(p1_before, p1_after[lane], p2_before, p2_after[lane])
+        return score
+
+    def place_wall(self, position, orientation):
+        """
+          Place a wall for the current player if they have walls left and the placement is valid.
+          Updates the wall count for the current player and switches the turn.
+
+          Unlike make_move, the wall may be placed anywhere on the board, which is what a human player needs.
+
+          Parameters:
+          position (tuple): The (x, y) grid coordinates of the wall.
+          orientation (str): The orientation of the wall ('VERTICAL' or 'HORIZONTAL').
+
+          Returns:
+          bool: True if the wall was placed, False otherwise.
+          """
+        if self.wall_counts[self.current_turn] == 0 or not self.is_wall_valid(position, orientation):
+            return False
+
+        self.do_move(('WALL_' + orientation, tuple(position)))
+        return True
+
+    def make_move(self, move):
+        """
+         Execute a move, which can be a pawn move or wall placement.
+
+         Parameters:
+         move (tuple): A tuple containing the move type ('MOVE' or 'WALL') and the move data
+                       (coordinates for the move or wall).
+
+         This function checks the move against the rules without generating all possible moves: the pawn
+         move must be one of the reachable squares, the wall must be valid and the player must have walls left.
+         An invalid move only passes the turn. Moves known to be legal, like those of possible_moves(),
+         can be played with do_move to skip the checks.
+         """
+        move_type, move_data = move
+        player = self.current_turn
+
+        if move_type == 'MOVE':
+            legal = move_data in self.available_moves_from_position(self.pawns[player])
+        elif move_type in ('WALL_VERTICAL', 'WALL_HORIZONTAL'):
+            legal = self.wall_counts[player] > 0 and self.is_wall_valid(move_data, move_type[len('WALL_'):])
+        else:
+            legal = False
+
+        if legal:
+            self.do_move(move)
+        else:
+            self.undo_stack.append((None, player, None, None))
+            self.switch_turn()
+
+    def do_move(self, move):
+        """
+         Execute a legal move without checking it and record it on the undo stack.
+
+         Parameters:
+         move (tuple): A move from possible_moves().
+         """
+        move_type, move_data = move
+        player = self.current_turn
+
+        if move_type == 'MOVE':
+            pawn = self.pawns[player]
+            self.undo_stack.append(('MOVE', player, pawn, self.previous_position[player]))
+            self.previous_position[player] = pawn
+            self.move_pawn(player, move_data)
+        else:
+            orientation = move_type[len('WALL_'):]
+            slot = wall_slot(move_data, orientation, self.size)
+            self.undo_stack.append((move_type, player, slot, orientation))
+            self.add_wall(slot)
+            self.walls[orientation].append(tuple(move_data))
+            self.change_wall_count(player, -1)
+
+        self.switch_turn()
+
+    def unmake_move(self, move):
+        """
+           Unmake the last executed move, restoring the game state.
+
+           Parameters:
+           move (tuple): The move to take back. Only kept for easyAI, the exact changes are read
+                         from the undo stack.
+
+           This function is important for implementing AI search algorithms that require
+           evaluating multiple potential game states.
+           """
+        move_type, player, change, previous = self.undo_stack.pop()
+        self.switch_turn()
+        if move_type == 'MOVE':
+            self.move_pawn(player, change)
+            self.previous_position[player] = previous
+        elif move_type is not None:
+            self.change_wall_count(player, 1)
+            self.remove_wall(change)
+            self.walls[previous].pop()
+
+    def win(self):
+        """
+           Check if the current player has won the game by reaching their goal row.
+
+           Returns:
+           bool: True if the current player has won, False otherwise.
+           """
+        if self.current_turn == 0:
+            return self.pawns[0][1] == self.size - 1
+        else:
+            return self.pawns[1][1] == 0
+
+    def is_over(self):
+        """
+         Check if the game is over, i.e. either pawn has reached its goal row.
+
+         The turn has already been switched after the winning move, so both pawns are checked.
+
+         Returns:
+         bool: True if the game is over, False otherwise.
+         """
+        return self.pawns[0][1] == self.size - 1 or self.pawns[1][1] == 0
+
+    def solve_race(self):
+        """
+          Solve the position exactly if it has become a race that walls can no longer change.
+
+          Pawns do not block each other, so once a player cannot be slowed down they reach the goal in exactly
+          their shortest-path distance. The player ahead (the one on turn when the distances are equal) wins
+          with certainty if the other player has no walls left to slow them down, which covers every position
+          where both players have used all their walls.
+
+          Returns:
+          tuple: (index of the winning player, plies until the winner reaches the goal), or None if walls
+                 can still decide the game. Must not be called on a finished game.
+          """
+        me = self.current_turn
+        my_distance = self.distance_maps[me].distance(self.pawns[me])
+        their_distance = self.distance_maps[1 - me].distance(self.pawns[1 - me])
+        if my_distance <= their_distance and self.wall_counts[1 - me] == 0:
+            return me, 2 * my_distance - 1
+        if their_distance < my_distance and self.wall_counts[me] == 0:
+            return 1 - me, 2 * their_distance
+        return None
+
+    def race_move(self):
+        """
+          Get a step along the shortest path of the player on turn, the best move of a race.
+
+          Returns:
+          tuple: The pawn move.
+          """
+        player = self.current_turn
+        distance_map = self.distance_maps[player]
+        steps = self.available_moves_from_position(self.pawns[player])
+        return 'MOVE', min(steps, key=distance_map.distance)
+
+    def scoring(self):
+        """
+         Evaluate the current game state for AI decision-making.
+
+         Returns:
+         int: A score reflecting the desirability of the current state for the AI.
+               Higher scores indicate more favorable conditions for the AI player.
+         """
+        if self.pawns[0][1] == self.size - 1:  # Player 1 reached the last row
+            return -1000
+        if self.pawns[1][1] == 0:  # Player 2 reached the first row
+            return 10000000000000000000
+
+        wall_score = self.wall_impact_score()
+
+        player1_position = self.pawns[0][1]
+        player2_position = self.pawns[1][1]
+        score = (self.size - player2_position) * 10
+        score -= player1_position * 10
+        score += (player1_position - player2_position) * 5
+        score += wall_score
+        if self.previous_position[self.current_turn] == self.pawns[self.current_turn]:
+            score -= 200
+        return score
@@ -0,0 +1,304 @@
+"""
+Opt-in instrumentation of the engine and the AI searches.
+
+While enabled, the hot methods of QuoridorGame, DistanceMap, AlphaBeta and TranspositionTable are replaced by
+wrappers counting their calls, and the time spent generating moves, searching paths and evaluating positions
+is measured. Disabling
+puts the original methods back, so the engine runs exactly the same code as without instrumentation and
+pays nothing for it.
+
+Counters:
+    nodes                  - alpha-beta nodes visited (AlphaBeta.negamax calls)
+    bfs                    - full-board path searches: DistanceMap.rebuild and the QuoridorGame.bfs and
+                             bfs_shortest_path entry points (the search itself only uses the distance maps)
+    bfs_incremental        - distance map updates and what-if queries: DistanceMap.raised_by_wall (behind
+                             distance_with_wall and wall_added) and DistanceMap.wall_removed
+    bfs_batched            - bit-parallel searches over every wall slot (QuoridorGame.distances_with_each_wall)
+    bfs_time               - seconds spent in the three kinds of path search
+    wall_checks, wall_check_time - wall legality checks (QuoridorGame.wall_keeps_paths, behind both
+                             possible_moves and is_wall_valid) and seconds spent in them
+    wall_seal_checks       - QuoridorGame.wall_seals_off calls, the distance map test of the checked walls
+                             that could close a region off
+    tt_probes, tt_hits     - transposition table probes and the ones that found an entry
+    movegen, movegen_time  - QuoridorGame.possible_moves calls and seconds spent in them
+    ordering, ordering_time - AlphaBeta.order_moves calls and seconds spent in them (path gains of the moves)
+    scoring, scoring_time  - QuoridorGame.scoring calls and seconds spent in them
+
+The timers nest: bfs_time and wall_check_time are also part of the move generation, ordering and scoring time
+of the calls they happen in.
+
+The wrappers patch the classes, so every game and searcher of the process is counted, including searches
+running in a background thread. Worker processes have to enable their own instrumentation.
+
+Example:
+    instrumentation = Instrumentation()
+    player = instrumentation.wrap(AlphaBeta(time_limit_ms=200))
+    with instrumentation:
+        move = player(game)
+    print(instrumentation.moves[-1]["nodes"], instrumentation.summary())
+"""
+
+import time
+
+from engine import QuoridorGame, DistanceMap
+from search import AlphaBeta
+from transposition import TranspositionTable
+
+COUNTERS = ("nodes", "bfs", "bfs_incremental", "bfs_batched", "wall_checks", "wall_seal_checks",
+            "tt_probes", "tt_hits", "movegen", "ordering", "scoring")
+TIMERS = ("bfs_time", "wall_check_time", "movegen_time", "ordering_time", "scoring_time")
+
+# Counted methods: (class, attribute, counter, timer or None)
+PATCHES = (
+    (AlphaBeta, "negamax", "nodes", None),
+    (QuoridorGame, "bfs", "bfs", "bfs_time"),
+    (QuoridorGame, "bfs_shortest_path", "bfs", "bfs_time"),
+    (DistanceMap, "rebuild", "bfs", "bfs_time"),
+    (DistanceMap, "raised_by_wall", "bfs_incremental", "bfs_time"),
+    (DistanceMap, "wall_removed", "bfs_incremental", "bfs_time"),
+    (QuoridorGame, "distances_with_each_wall", "bfs_batched", "bfs_time"),
+    (QuoridorGame, "wall_keeps_paths", "wall_checks", "wall_check_time"),
+    (QuoridorGame, "wall_seals_off", "wall_seal_checks", None),
+    (QuoridorGame, "possible_moves", "movegen", "movegen_time"),
+    (AlphaBeta, "order_moves", "ordering", "ordering_time"),
+    (QuoridorGame, "scoring", "scoring", "scoring_time"),
+)
+
+
+class Instrumentation:
+    """
+      Counters of engine and search work, with a record per AI move.
+
+      The instrumentation is enabled with enable() or a with block. Only one instance can be enabled at a time.
+      """
+
+    active = None  # The enabled instance, if any
+
+    def __init__(self):
+        """
+          Create disabled instrumentation with all counters at zero.
+          """
+        self.counters = dict.fromkeys(COUNTERS + TIMERS, 0)
+        self.originals = []
+        self.moves = []  # Counters and think time of every move measured by a wrapped player
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disable()
+
+    def enable(self):
+        """
+          Replace the counted methods by counting wrappers.
+
+          Raises:
+          RuntimeError: If another instance is already enabled.
+          """
+        if Instrumentation.active is self:
+            return
+        if Instrumentation.active is not None:
+            raise RuntimeError("another Instrumentation is already enabled")
+        Instrumentation.active = self
+        for cls, name, counter, timer in PATCHES:
+            original = cls.__dict__[name]
+            self.originals.append((cls, name, original))
+            setattr(cls, name, self.counted(original, counter, timer))
+        original_probe = TranspositionTable.probe
+        self.originals.append((TranspositionTable, "probe", original_probe))
+        TranspositionTable.probe = self.counted_probe(original_probe)
+
+    def disable(self):
+        """
+          Put the original methods back. The counters keep their values.
+          """
+        if Instrumentation.active is not self:
+            return
+        for cls, name, original in reversed(self.originals):
+            setattr(cls, name, original)
+        self.originals = []
+        Instrumentation.active = None
+
+    def counted(self, method, counter, timer):
+        """
+          Wrap a method so its calls, and optionally its time, are added to the counters.
+
+          Parameters:
+          method (function): The original method.
+          counter (str): Name of the call counter.
+          timer (str): Name of the time counter, or None to only count calls.
+
+          Returns:
+          function: The wrapper.
+          """
+        counters = self.counters
+        if timer is None:
+            def wrapper(*args, **kwargs):
+                counters[counter] += 1
+                return method(*args, **kwargs)
+        else:
+            def wrapper(*args, **kwargs):
+                counters[counter] += 1
+                started = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    counters[timer] += time.perf_counter() - started
+        wrapper.__wrapped__ = method
+        return wrapper
+
+    def counted_probe(self, probe):
+        """
+          Wrap TranspositionTable.probe to count probes and hits.
+
+          Parameters:
+          probe (function): The original method.
+
+          Returns:
+          function: The wrapper.
+          """
+        counters = self.counters
+
+        def wrapper(table, key):
+            counters["tt_probes"] += 1
+            entry = probe(table, key)
+            if entry is not None:
+                counters["tt_hits"] += 1
+            return entry
+        wrapper.__wrapped__ = probe
+        return wrapper
+
+    def reset(self):
+        """
+          Set all counters to zero and forget the recorded moves.
+          """
+        for name in self.counters:
+            self.counters[name] = 0
+        self.moves = []
+
+    def wrap(self, player, label=None):
+        """
+          Wrap an AI player so each of its moves is recorded in self.moves.
+
+          Parameters:
+          player (callable): The player, taking a game and returning a move.
+          label: Stored as "player" in the move records, to tell several players apart.
+
+          Returns:
+          InstrumentedPlayer: A player choosing the same moves.
+          """
+        return InstrumentedPlayer(player, self, label)
+
+    def summary(self, label=None):
+        """
+          Summarize the recorded moves, typically those of one game.
+
+          Parameters:
+          label: Only summarize the moves of the player wrapped with this label, all moves if not given.
+
+          Returns:
+          dict: The result of summarize().
+          """
+        return summarize([move for move in self.moves if label is None or move["player"] == label])
+
+
+class InstrumentedPlayer:
+    """
+      AI player recording the counters of every move it makes.
+      """
+
+    def __init__(self, player, instrumentation, label=None):
+        """
+          Create the wrapper.
+
+          Parameters:
+          player (callable): The player, taking a game and returning a move.
+          instrumentation (Instrumentation): Receives the per-move records.
+          label: Stored as "player" in the move records.
+          """
+        self.player = player
+        self.instrumentation = instrumentation
+        self.label = label
+
+    def __call__(self, game):
+        """
+          Choose a move with the wrapped player and record what it cost.
+
+          Parameters:
+          game (QuoridorGame): The position.
+
+          Returns:
+          tuple: The move chosen by the wrapped player.
+          """
+        counters = self.instrumentation.counters
+        before = dict(counters)
+        started = time.perf_counter()
+        move = self.player(game)
+        record = {name: counters[name] - before[name] for name in counters}
+        record["think_time"] = time.perf_counter() - started
+        record["depth"] = getattr(self.player, "depth_reached", None)
+        record["player"] = self.label
+        self.instrumentation.moves.append(record)
+        return move
+
+    def __getattr__(self, name):
+        # Settings and statistics of the wrapped player, e.g. close() or ordering_stats()
+        return getattr(self.player, name)
+
+
+def summarize(moves):
+    """
+      Add up the records of several moves.
+
+      Parameters:
+      moves (list): Move records of Instrumentation.moves.
+
+      Returns:
+      dict: Number of moves, think time, totals of every counter, their averages per move,
+            nodes per second, TT hit rate and the share of the think time spent in path searches, wall
+            checks, move generation, move ordering and scoring.
+      """
+    totals = dict.fromkeys(COUNTERS + TIMERS, 0)
+    think_time = 0.0
+    for move in moves:
+        think_time += move["think_time"]
+        for name in totals:
+            totals[name] += move[name]
+    count = len(moves)
+    summary = {"moves": count, "think_time": think_time}
+    summary.update(totals)
+    summary["per_move"] = {name: value / count for name, value in totals.items()} if count else {}
+    summary["nodes_per_second"] = totals["nodes"] / think_time if think_time else 0.0
+    summary["tt_hit_rate"] = totals["tt_hits"] / totals["tt_probes"] if totals["tt_probes"] else 0.0
+    for timer in TIMERS:
+        summary[timer + "_share"] = totals[timer] / think_time if think_time else 0.0
+    return summary
+
+
+def format_summary(summary):
+    """
+      Format a summary for printing.
+
+      Parameters:
+      summary (dict): The result of summarize() or Instrumentation.summary().
+
+      Returns:
+      str: Several lines of text.
+      """
+    if not summary["moves"]:
+        return "No moves recorded"
+    per_move = summary["per_move"]
+    return "\n".join([
+        f"{summary['moves']} moves, {summary['think_time']:.2f} s thinking, "
+        f"{summary['nodes']} nodes ({summary['nodes_per_second']:.0f} nodes/s, {per_move['nodes']:.0f} per move)",
+        f"Per move: {per_move['bfs']:.0f} full BFS, {per_move['bfs_incremental']:.0f} incremental, "
+        f"{per_move['bfs_batched']:.0f} batched, {per_move['wall_checks']:.0f} wall checks, "
+        f"{per_move['wall_seal_checks']:.0f} seal checks, {per_move['tt_probes']:.0f} TT probes "
+        f"({summary['tt_hit_rate']:.0%} hits)",
+        f"Time: path search {summary['bfs_time']:.2f} s ({summary['bfs_time_share']:.0%}), "
+        f"wall checks {summary['wall_check_time']:.2f} s ({summary['wall_check_time_share']:.0%}); "
+        f"move generation {summary['movegen_time']:.2f} s ({summary['movegen_time_share']:.0%}), "
+        f"ordering {summary['ordering_time']:.2f} s ({summary['ordering_time_share']:.0%}), "
+        f"scoring {summary['scoring_time']:.2f} s ({summary['scoring_time_share']:.0%})",
+    ])
@@ -0,0 +1,189 @@
+"""
+Load-test client for server.py.
+
+Simulates many players, each on its own connection, playing games against the server's AI as fast as the
+server answers. Simulated players step along their shortest path and now and then place a random wall.
+Every request is timed from sending it to receiving the answer; the report gives the number of moves
+per second (human and AI moves) and the latency percentiles.
+
+Usage:
+    python loadtest.py <players> <seconds> [<port>] [<time_limit_ms>]
+
+Example:
+    python server.py &
+    python loadtest.py 200 30
+"""
+
+import asyncio
+import json
+import random
+import sys
+import time
+
+from engine import QuoridorGame, ORIENTATIONS
+from server import HOST, PORT
+
+WALL_RATE = 0.1  # Probability of trying a random wall instead of a pawn step
+
+
+def choose_move(game, rng):
+    """
+      Choose the simulated player's move.
+
+      Parameters:
+      game (QuoridorGame): Local copy of the game.
+      rng (random.Random): Source of randomness.
+
+      Returns:
+      list: [move type, [x, y]].
+      """
+    player = game.current_turn
+    if game.wall_counts[player] > 0 and rng.random() < WALL_RATE:
+        position = (rng.randrange(game.size), rng.randrange(game.size))
+        orientation = rng.choice(ORIENTATIONS)
+        if game.is_wall_valid(position, orientation):
+            return ["WALL_" + orientation, list(position)]
+    distance_map = game.distance_maps[player]
+    pawn = game.pawns[player]
+    steps = game.available_moves_from_position(pawn)
+    return ["MOVE", min(steps, key=lambda step: (distance_map.distance(step), rng.random()))]
+
+
+def apply_move(game, move):
+    """
+      Replay a move on the local copy of the game.
+
+      Parameters:
+      game (QuoridorGame): Local copy of the game.
+      move (list): [move type, [x, y]] as sent over the wire.
+      """
+    move_type, position = move
+    game.do_move((move_type, list(position) if move_type == "MOVE" else tuple(position)))
+
+
+async def request(reader, writer, message, latencies):
+    """
+      Send one request and wait for its answer.
+
+      Parameters:
+      reader (asyncio.StreamReader): The connection's input.
+      writer (asyncio.StreamWriter): The connection's output.
+      message (dict): The request.
+      latencies (list): Receives the round-trip time in seconds.
+
+      Returns:
+      dict: The response.
+      """
+    started = time.perf_counter()
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+    response = json.loads(await reader.readline())
+    latencies.append(time.perf_counter() - started)
+    return response
+
+
+async def simulated_player(port, deadline, time_limit_ms, seed, stats):
+    """
+      Play games on one connection until the deadline.
+
+      Parameters:
+      port (int): Server port.
+      deadline (float): time.perf_counter() value after which no new move is sent.
+      time_limit_ms (int): AI think time requested for the games.
+      seed (int): Seed of the player's random choices.
+      stats (dict): Shared counters: latencies, moves, games (finished), abandoned (cut off by the deadline or
+                    an error), errors.
+      """
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(HOST, port)
+    try:
+        while time.perf_counter() < deadline:
+            response = await request(reader, writer, {"cmd": "new", "time_limit_ms": time_limit_ms}, stats["latencies"])
+            game_id = response["game"]
+            game = QuoridorGame()
+            while not game.is_over() and time.perf_counter() < deadline:
+                move = choose_move(game, rng)
+                response = await request(reader, writer, {"cmd": "move", "game": game_id, "move": move},
+                                         stats["latencies"])
+                if not response["ok"]:
+                    stats["errors"] += 1
+                    break
+                apply_move(game, move)
+                stats["moves"] += 1
+                if response["ai_move"] is not None:
+                    apply_move(game, response["ai_move"])
+                    stats["moves"] += 1
+            await request(reader, writer, {"cmd": "close", "game": game_id}, stats["latencies"])
+            if game.is_over():
+                stats["games"] += 1
+            else:
+                stats["abandoned"] += 1
+    finally:
+        writer.close()
+
+
+def percentile(values, fraction):
+    """
+      Get a percentile of a list of numbers.
+
+      Parameters:
+      values (list): The numbers.
+      fraction (float): The percentile as a fraction, e.g. 0.99.
+
+      Returns:
+      float: The value below which the given fraction of the numbers lie.
+      """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+async def run_load_test(players, seconds, port=PORT, time_limit_ms=20):
+    """
+      Run simulated players against a running server.
+
+      Parameters:
+      players (int): Number of concurrent players (connections).
+      seconds (float): Duration of the test.
+      port (int): Server port.
+      time_limit_ms (int): AI think time requested for the games.
+
+      Returns:
+      dict: moves, games (finished), abandoned games, errors, requests, moves_per_second, games_per_second
+            and p50/p99/max latency in seconds.
+      """
+    stats = {"latencies": [], "moves": 0, "games": 0, "abandoned": 0, "errors": 0}
+    started = time.perf_counter()
+    deadline = started + seconds
+    await asyncio.gather(*(simulated_player(port, deadline, time_limit_ms, seed, stats) for seed in range(players)))
+    elapsed = time.perf_counter() - started
+
+    latencies = stats["latencies"]
+    return {
+        "players": players,
+        "elapsed": elapsed,
+        "moves": stats["moves"],
+        "games": stats["games"],
+        "abandoned": stats["abandoned"],
+        "errors": stats["errors"],
+        "requests": len(latencies),
+        "moves_per_second": stats["moves"] / elapsed,
+        "games_per_second": stats["games"] / elapsed,
+        "p50_latency": percentile(latencies, 0.5),
+        "p99_latency": percentile(latencies, 0.99),
+        "max_latency": max(latencies, default=0.0),
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4, 5):
+        print("Usage: python loadtest.py <players> <seconds> [<port>] [<time_limit_ms>]")
+        sys.exit(1)
+
+    report = asyncio.run(run_load_test(int(sys.argv[1]), float(sys.argv[2]),
+                                       int(sys.argv[3]) if len(sys.argv) > 3 else PORT,
+                                       int(sys.argv[4]) if len(sys.argv) > 4 else 20))
+    print(f"{report['players']} players, {report['elapsed']:.1f} s: {report['moves']} moves "
+          f"({report['moves_per_second']:.1f} moves/s), {report['games']} games finished "
+          f"({report['games_per_second']:.2f} games/s), {report['abandoned']} abandoned, {report['errors']} errors")
+    print(f"Latency over {report['requests']} requests: p50 {report['p50_latency'] * 1000:.1f} ms, "
+          f"p99 {report['p99_latency'] * 1000:.1f} ms, max {report['max_latency'] * 1000:.1f} ms")
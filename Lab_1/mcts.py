@@ -0,0 +1,303 @@
+"""
+Monte Carlo Tree Search (UCT) player for QuoridorGame.
+
+The tree is grown one playout at a time: moves are selected with the UCB1 formula down to a leaf,
+one new move is expanded and the game is finished with a fast rollout. Rollouts mostly step along the
+shortest path (read from the engine's distance maps) with some random pawn steps and random walls mixed
+in, and are cut off after a fixed number of plies, in which case the race to the goal decides the winner.
+A rollout also stops as soon as the race is decided for certain (QuoridorGame.solve_race), and a root
+position that is already decided is answered at once without playouts.
+
+The strength/time tradeoff is set by the playout budget. With several workers, each process grows its own
+tree from the same root and the root statistics are merged (root parallelization).
+
+The player is a callable taking a game and returning a move, so it plugs into easyAI's AI_Player.
+"""
+
+import math
+import os
+import random
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import QuoridorGame, ORIENTATIONS
+
+
+class Node:
+    """
+      A node of the search tree, reached by playing move from its parent.
+      """
+
+    __slots__ = ("move", "parent", "children", "untried", "visits", "wins", "player")
+
+    def __init__(self, move, parent, untried, player):
+        """
+          Create a node.
+
+          Parameters:
+          move (tuple): The move leading to this node, None for the root.
+          parent (Node): The parent node, None for the root.
+          untried (list): Moves of this position not expanded yet.
+          player (int): Index of the player who made move.
+          """
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0
+        self.player = player
+
+    def select_child(self, exploration):
+        """
+          Pick the child with the best UCB1 value.
+
+          Parameters:
+          exploration (float): Weight of the exploration term.
+
+          Returns:
+          Node: The selected child.
+          """
+        log_visits = math.log(self.visits)
+        return max(self.children,
+                   key=lambda child: child.wins / child.visits + exploration * math.sqrt(log_visits / child.visits))
+
+
+def move_key(move):
+    """
+      Turn a move into a hashable key, so root statistics of different trees can be merged.
+
+      Parameters:
+      move (tuple): The move.
+
+      Returns:
+      tuple: (move type, coordinates as a tuple).
+      """
+    return move[0], tuple(move[1])
+
+
+def winner(game):
+    """
+      Get the winner of a finished game.
+
+      Parameters:
+      game (QuoridorGame): A game where a pawn has reached its goal row.
+
+      Returns:
+      int: Index of the winning player.
+      """
+    return 0 if game.pawns[0][1] == game.size - 1 else 1
+
+
+def race_winner(game):
+    """
+      Guess the winner of an unfinished game from the race to the goal.
+
+      Without further walls the player on turn wins if their path is not longer than the opponent's.
+
+      Parameters:
+      game (QuoridorGame): The game.
+
+      Returns:
+      int: Index of the player expected to win.
+      """
+    me = game.current_turn
+    my_distance = game.distance_maps[me].distance(game.pawns[me])
+    their_distance = game.distance_maps[1 - me].distance(game.pawns[1 - me])
+    return me if my_distance <= their_distance else 1 - me
+
+
+def rollout(game, rng, path_bias, wall_rate, max_plies):
+    """
+      Finish a game with fast, mostly shortest-path moves. The game is modified.
+
+      Parameters:
+      game (QuoridorGame): The game to play out.
+      rng (random.Random): Source of randomness.
+      path_bias (float): Probability of a step along the shortest path.
+      wall_rate (float): Probability of trying a random wall when not following the path.
+      max_plies (int): Number of plies after which the race decides the winner.
+
+      Returns:
+      int: Index of the winning player.
+      """
+    for _ in range(max_plies):
+        if game.is_over():
+            return winner(game)
+        race = game.solve_race()
+        if race is not None:
+            return race[0]
+        player = game.current_turn
+        pawn = game.pawns[player]
+
+        if rng.random() >= path_bias and game.wall_counts[player] > 0 and rng.random() < wall_rate:
+            position = (rng.randrange(game.size), rng.randrange(game.size))
+            if game.place_wall(position, rng.choice(ORIENTATIONS)):
+                continue
+
+        steps = game.available_moves_from_position(pawn)
+        if rng.random() < path_bias:
+            distance_map = game.distance_maps[player]
+            target = distance_map.distance(pawn) - 1
+            closer = [step for step in steps if distance_map.distance(step) == target]
+            if closer:
+                steps = closer
+        game.previous_position[player] = pawn
+        game.move_pawn(player, rng.choice(steps))
+        game.switch_turn()
+
+    if game.is_over():
+        return winner(game)
+    return race_winner(game)
+
+
+def grow_tree(state, playouts, deadline, seed, exploration, path_bias, wall_rate, max_plies):
+    """
+      Run playouts from a position and report the statistics of the root moves.
+
+      Parameters:
+      state (tuple): Snapshot of the root position.
+      playouts (int): Number of playouts to run.
+      deadline (float): Wall-clock time (time.time()) after which no new playout is started.
+      seed (int): Seed of the random generator.
+      exploration (float): Weight of the UCB1 exploration term.
+      path_bias (float): Probability of a rollout step along the shortest path.
+      wall_rate (float): Probability of trying a random wall in rollouts when not following the path.
+      max_plies (int): Rollout length after which the race decides the winner.
+
+      Returns:
+      dict: (visits, wins) of every root move, keyed by move_key().
+      """
+    rng = random.Random(seed)
+    root_game = QuoridorGame.from_snapshot(state)
+    root = Node(None, None, root_game.possible_moves(), 1 - root_game.current_turn)
+
+    for _ in range(playouts):
+        if time.time() > deadline:
+            break
+        game = QuoridorGame.from_snapshot(state)
+        node = root
+
+        # Selection
+        while not node.untried and node.children:
+            node = node.select_child(exploration)
+            game.do_move(node.move)
+
+        # Expansion
+        if node.untried and not game.is_over():
+            move = node.untried.pop(rng.randrange(len(node.untried)))
+            player = game.current_turn
+            game.do_move(move)
+            child = Node(move, node, [] if game.is_over() else game.possible_moves(), player)
+            node.children.append(child)
+            node = child
+
+        # Simulation
+        result = rollout(game, rng, path_bias, wall_rate, max_plies)
+
+        # Backpropagation
+        while node is not None:
+            node.visits += 1
+            if node.player == result:
+                node.wins += 1
+            node = node.parent
+
+    return {move_key(child.move): (child.visits, child.wins) for child in root.children}
+
+
+class MCTS:
+    """
+      UCT player with a configurable playout budget and optional parallel workers.
+      """
+
+    def __init__(self, playouts=1000, time_limit_ms=None, workers=1, exploration=1.4, path_bias=0.7,
+                 wall_rate=0.3, max_rollout_plies=100, seed=None, book=None):
+        """
+          Create the player, worker processes are started on the first search.
+
+          Parameters:
+          playouts (int): Playouts per move, split between the workers.
+          time_limit_ms (int): Optional time budget per move in milliseconds, playouts stop when it runs out.
+          workers (int): Number of processes growing trees, 1 searches in the calling process.
+          exploration (float): Weight of the UCB1 exploration term.
+          path_bias (float): Probability of a rollout step along the shortest path.
+          wall_rate (float): Probability of trying a random wall in rollouts when not following the path.
+          max_rollout_plies (int): Rollout length after which the race decides the winner.
+          seed (int): Seed for reproducible searches, random if not given.
+          book (OpeningBook): Optional opening book, positions found in it are not searched.
+          """
+        self.playouts = playouts
+        self.time_limit = time_limit_ms / 1000 if time_limit_ms is not None else None
+        self.workers = workers or os.cpu_count() or 1
+        self.exploration = exploration
+        self.path_bias = path_bias
+        self.wall_rate = wall_rate
+        self.max_rollout_plies = max_rollout_plies
+        self.rng = random.Random(seed)
+        self.pool = None
+        self.root_stats = {}
+        self.book = book
+
+    def __call__(self, game):
+        """
+          Choose a move for the player on turn, used by easyAI's AI_Player.
+
+          Parameters:
+          game (QuoridorGame): The position to search. It is not modified.
+
+          Returns:
+          tuple: The chosen move, taken from the opening book when the position is in it.
+          """
+        if self.book is not None:
+            move = self.book.lookup(game)
+            if move is not None:
+                return move
+        return self.search(game)
+
+    def search(self, game):
+        """
+          Spend the playout budget and return the most visited root move.
+
+          Parameters:
+          game (QuoridorGame): The position to search. It is not modified.
+
+          Returns:
+          tuple: The chosen move.
+          """
+        if not game.is_over() and game.solve_race() is not None:
+            return game.race_move()
+
+        state = game.snapshot()
+        deadline = time.time() + self.time_limit if self.time_limit is not None else math.inf
+        settings = (self.exploration, self.path_bias, self.wall_rate, self.max_rollout_plies)
+
+        if self.workers == 1:
+            results = [grow_tree(state, self.playouts, deadline, self.rng.getrandbits(32), *settings)]
+        else:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(self.workers)
+            share = -(-self.playouts // self.workers)
+            futures = [self.pool.submit(grow_tree, state, share, deadline, self.rng.getrandbits(32), *settings)
+                       for _ in range(self.workers)]
+            results = [future.result() for future in futures]
+
+        stats = {}
+        for result in results:
+            for key, (visits, wins) in result.items():
+                total_visits, total_wins = stats.get(key, (0, 0.0))
+                stats[key] = (total_visits + visits, total_wins + wins)
+        self.root_stats = stats
+
+        moves = game.possible_moves()
+        if not stats:
+            return moves[0]
+        return max(moves, key=lambda move: stats.get(move_key(move), (0, 0.0))[0])
+
+    def close(self):
+        """
+          Shut the worker processes down.
+          """
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
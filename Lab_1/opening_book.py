@@ -0,0 +1,224 @@
+"""
+Opening book for QuoridorGame.
+
+Every game starts from the same position, so the first moves are searched offline, deeply, and stored in a
+file. The book holds every position of the first FULL_WIDTH_PLIES plies (through the moves of possible_moves()),
+so the AI has a book move for its first turn whichever side it plays. From there it follows the predicted line
+of each of these positions, the best move found at every ply, down to BOOK_PLIES plies: later book moves are
+played as long as the opponent keeps to the engine's prediction, and the file stays small.
+
+File format (little-endian):
+    header: magic b"QOB1", number of entries (uint32)
+    entries, sorted by key: Zobrist key of the position (uint64), encoded move (uint16)
+
+A move is encoded as type * 81 + y * 9 + x, where type is the index of the move type in MOVE_TYPES.
+The file is memory-mapped and searched with a binary search, so opening it is instant and lookups
+do not read the whole file.
+
+Usage:
+    python opening_book.py [<plies>] [<time_limit_ms>] [<output_file>]
+
+Example:
+    python opening_book.py    # the shipped book: 4 plies, 1500 ms per position
+"""
+
+import mmap
+import os
+import struct
+import sys
+import time
+
+from engine import QuoridorGame, GRID_SIZE
+from search import AlphaBeta
+
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin")
+MAGIC = b"QOB1"
+HEADER = struct.Struct("<4sI")
+ENTRY = struct.Struct("<QH")
+MOVE_TYPES = ("MOVE", "WALL_VERTICAL", "WALL_HORIZONTAL")
+BOOK_PLIES = 4  # Depth of the shipped book
+BOOK_TIME_LIMIT_MS = 1500  # Search time per position of the shipped book
+FULL_WIDTH_PLIES = 2  # Plies in which every position is in the book, the predicted lines only after them
+
+
+def encode_move(move):
+    """
+      Pack a move into a 16-bit number.
+
+      Parameters:
+      move (tuple): The move, e.g. ('MOVE', [4, 1]) or ('WALL_HORIZONTAL', (3, 4)).
+
+      Returns:
+      int: The encoded move.
+      """
+    move_type, (x, y) = move
+    return (MOVE_TYPES.index(move_type) * GRID_SIZE + y) * GRID_SIZE + x
+
+
+def decode_move(code):
+    """
+      Unpack a move encoded by encode_move.
+
+      Parameters:
+      code (int): The encoded move.
+
+      Returns:
+      tuple: (move type, (x, y)).
+      """
+    rest, x = divmod(code, GRID_SIZE)
+    move_type, y = divmod(rest, GRID_SIZE)
+    return MOVE_TYPES[move_type], (x, y)
+
+
+class OpeningBook:
+    """
+      Read-only opening book backed by a memory-mapped file.
+      """
+
+    def __init__(self, path=BOOK_FILE):
+        """
+          Open and memory-map a book file.
+
+          Parameters:
+          path (str): Path of the file written by write_book.
+          """
+        with open(path, "rb") as book_file:
+            self.data = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            self.data.close()
+            raise ValueError(f"{path} is not an opening book")
+        self.hits = 0
+
+    def __len__(self):
+        return self.count
+
+    def probe(self, key):
+        """
+          Find the encoded move stored for a position key.
+
+          Parameters:
+          key (int): Zobrist key of the position.
+
+          Returns:
+          int: The encoded move, or None if the position is not in the book.
+          """
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            entry_key, code = ENTRY.unpack_from(self.data, HEADER.size + middle * ENTRY.size)
+            if entry_key == key:
+                return code
+            if entry_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def lookup(self, game):
+        """
+          Get the book move of a position.
+
+          Parameters:
+          game (QuoridorGame): The position.
+
+          Returns:
+          tuple: The move in the format of game.possible_moves(), or None if the position is not in the book
+                 or the stored move is not legal there. Books cover the standard board only.
+          """
+        if game.size != GRID_SIZE:
+            return None
+        code = self.probe(game.zobrist)
+        if code is None:
+            return None
+        move_type, position = decode_move(code)
+        for move in game.possible_moves():
+            if move[0] == move_type and tuple(move[1]) == position:
+                self.hits += 1
+                return move
+        return None
+
+    def close(self):
+        """
+          Unmap the file.
+          """
+        self.data.close()
+
+
+def open_book(path=BOOK_FILE):
+    """
+      Open a book file if it exists.
+
+      Parameters:
+      path (str): Path of the book file.
+
+      Returns:
+      OpeningBook: The book, or None if there is no such file.
+      """
+    if not os.path.exists(path):
+        return None
+    return OpeningBook(path)
+
+
+def write_book(path, entries):
+    """
+      Write a book file.
+
+      Parameters:
+      path (str): Path of the file to write.
+      entries (dict): Best move of every position, keyed by Zobrist key.
+      """
+    with open(path, "wb") as book_file:
+        book_file.write(HEADER.pack(MAGIC, len(entries)))
+        for key in sorted(entries):
+            book_file.write(ENTRY.pack(key, encode_move(entries[key])))
+
+
+def build_book(plies=BOOK_PLIES, time_limit_ms=BOOK_TIME_LIMIT_MS, max_depth=64,
+               full_width_plies=FULL_WIDTH_PLIES):
+    """
+      Search every position of the first plies and the predicted lines from them.
+
+      Parameters:
+      plies (int): Positions up to this many plies before the last one are searched
+                   (1 covers only the starting position).
+      time_limit_ms (int): Search time per position in milliseconds.
+      max_depth (int): Deepest search iteration per position.
+      full_width_plies (int): Every position of these first plies is searched, deeper positions only when
+                              they follow the best move of a searched position.
+
+      Returns:
+      dict: Best move of every position, keyed by Zobrist key.
+      """
+    searcher = AlphaBeta(time_limit_ms=time_limit_ms, max_depth=max_depth)
+    entries = {}
+    frontier = [QuoridorGame().snapshot()]
+    for ply in range(plies):
+        next_frontier = []
+        for state in frontier:
+            game = QuoridorGame.from_snapshot(state)
+            if game.zobrist in entries or game.is_over():
+                continue
+            entries[game.zobrist] = searcher.search(game)
+            if ply + 1 < plies:
+                moves = game.possible_moves() if ply + 1 < full_width_plies else [entries[game.zobrist]]
+                for move in moves:
+                    game.do_move(move)
+                    next_frontier.append(game.snapshot())
+                    game.unmake_move(move)
+        print(f"Ply {ply}: {len(entries)} positions searched")
+        frontier = next_frontier
+    return entries
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 4:
+        print("Usage: python opening_book.py [<plies>] [<time_limit_ms>] [<output_file>]")
+        sys.exit(1)
+
+    started = time.time()
+    book = build_book(int(sys.argv[1]) if len(sys.argv) > 1 else BOOK_PLIES,
+                      int(sys.argv[2]) if len(sys.argv) > 2 else BOOK_TIME_LIMIT_MS)
+    output = sys.argv[3] if len(sys.argv) == 4 else BOOK_FILE
+    write_book(output, book)
+    print(f"{len(book)} positions written to {output} in {time.time() - started:.0f} s")
@@ -0,0 +1,150 @@
+"""
+Game records for QuoridorGame.
+
+A record file holds one game per line: the board size followed by the moves, separated by spaces.
+A move is written as the column letter and the 1-based row of its (x, y) position, with a "v" or "h" suffix
+for vertical and horizontal walls:
+    9 e2 e8 e3 d5h e4 f4v
+
+Pawn moves name the square the pawn moves to, walls use the same coordinates as the engine's wall moves.
+Blank lines and lines starting with "#" are ignored. Only legal moves are recorded, so replaying a record
+goes straight through the engine's unchecked do_move after a cheap legality check.
+"""
+
+from engine import QuoridorGame, GRID_SIZE
+
+COLUMNS = "abcdefghijklmnopqrs"  # Enough for the largest board the server accepts (19 x 19)
+WALL_SUFFIXES = {"WALL_VERTICAL": "v", "WALL_HORIZONTAL": "h"}
+SUFFIX_TYPES = {"v": "WALL_VERTICAL", "h": "WALL_HORIZONTAL"}
+
+
+def format_move(move):
+    """
+      Write a move in record notation.
+
+      Parameters:
+      move (tuple): The move, e.g. ('MOVE', [4, 1]) or ('WALL_HORIZONTAL', (3, 4)).
+
+      Returns:
+      str: The move token, e.g. "e2" or "d5h".
+      """
+    move_type, (x, y) = move
+    return f"{COLUMNS[x]}{y + 1}{WALL_SUFFIXES.get(move_type, '')}"
+
+
+def parse_move(token):
+    """
+      Read a move written by format_move.
+
+      Parameters:
+      token (str): The move token.
+
+      Returns:
+      tuple: The move, ('MOVE', [x, y]) or (wall move type, (x, y)).
+      """
+    move_type = SUFFIX_TYPES.get(token[-1])
+    if move_type is not None:
+        token = token[:-1]
+    x = COLUMNS.index(token[0])
+    y = int(token[1:]) - 1
+    if move_type is None:
+        return "MOVE", [x, y]
+    return move_type, (x, y)
+
+
+def format_game(moves, size=GRID_SIZE):
+    """
+      Write a game as one record line.
+
+      Parameters:
+      moves (list): The moves played from the starting position.
+      size (int): Board size.
+
+      Returns:
+      str: The record line, without the line break.
+      """
+    return " ".join([str(size)] + [format_move(move) for move in moves])
+
+
+def parse_game(line):
+    """
+      Read a record line.
+
+      Parameters:
+      line (str): The record line.
+
+      Returns:
+      tuple: (board size, list of moves).
+      """
+    tokens = line.split()
+    return int(tokens[0]), [parse_move(token) for token in tokens[1:]]
+
+
+def write_records(path, games, append=False):
+    """
+      Write games to a record file.
+
+      Parameters:
+      path (str): Path of the file.
+      games (iterable): (board size, moves) of every game.
+      append (bool): Whether to add to the file instead of replacing it.
+      """
+    with open(path, "a" if append else "w") as record_file:
+        for size, moves in games:
+            record_file.write(format_game(moves, size) + "\n")
+
+
+def read_records(path):
+    """
+      Read the games of a record file lazily.
+
+      Parameters:
+      path (str): Path of the file.
+
+      Returns:
+      generator: (board size, moves) of every game.
+      """
+    with open(path) as record_file:
+        for line in record_file:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield parse_game(line)
+
+
+def is_legal(game, move):
+    """
+      Check a move without generating all possible moves, like QuoridorGame.make_move does.
+
+      Parameters:
+      game (QuoridorGame): The position.
+      move (tuple): The move.
+
+      Returns:
+      bool: True if the player on turn may play the move.
+      """
+    move_type, move_data = move
+    if move_type == "MOVE":
+        return move_data in game.available_moves_from_position(game.pawns[game.current_turn])
+    return game.wall_counts[game.current_turn] > 0 and game.is_wall_valid(move_data, move_type[len("WALL_"):])
+
+
+def replay(moves, size=GRID_SIZE):
+    """
+      Replay a recorded game.
+
+      Parameters:
+      moves (list): The recorded moves.
+      size (int): Board size.
+
+      Returns:
+      QuoridorGame: The final position, with every move on its undo stack.
+
+      Raises:
+      ValueError: If a move is illegal or played after the end of the game.
+      """
+    game = QuoridorGame(size=size)
+    for ply, move in enumerate(moves):
+        if game.is_over() or not is_legal(game, move):
+            raise ValueError(f"illegal move {format_move(move)} at ply {ply}")
+        game.do_move(move)
+    return game
@@ -0,0 +1,666 @@
+"""
+Native alpha-beta searcher for QuoridorGame.
+
+The search deepens iteratively within a per-move time budget: every finished iteration gives a complete
+answer, and when the budget runs out the best move of the last finished iteration (or a better one already
+proven in the interrupted iteration) is returned. Moves are ordered with the principal variation first,
+taken from the previous iteration at the root and from the transposition table below it, then the killer
+moves of the ply, then by shortest-path gain (QuoridorGame.move_gain) with the history table breaking ties.
+Races that walls can no longer change (QuoridorGame.solve_race) are scored exactly instead of searched, and
+when the root is such a race the move is played at once.
+
+The searcher is a callable taking a game and returning a move, so it plugs into easyAI's AI_Player
+like Negamax does.
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import QuoridorGame
+from transposition import TranspositionTable, LOWERBOUND, EXACT, UPPERBOUND
+
+INF = float('inf')
+WIN_SCORE = 10 ** 9
+MAX_PLY = 256
+KILLERS_PER_PLY = 2
+
+# Per-process state of root-parallel search workers, set up by init_worker
+worker_searcher = None
+worker_bound = None
+
+
+class SearchTimeout(Exception):
+    """
+      Raised inside the search when the time budget of the move is exhausted.
+      """
+
+
+def move_key(move):
+    """
+      Turn a move into a hashable key for the killer and history tables.
+
+      Parameters:
+      move (tuple): The move.
+
+      Returns:
+      tuple: (move type, x, y).
+      """
+    return move[0], move[1][0], move[1][1]
+
+
+class AlphaBeta:
+    """
+      Alpha-beta search with iterative deepening, move ordering heuristics and a time budget.
+
+      After each search, ordering_stats() reports how often the ordering produced cutoffs.
+      """
+
+    def __init__(self, time_limit_ms=1000, max_depth=64, tt=None, book=None, ordering=True):
+        """
+          Create the searcher.
+
+          Parameters:
+          time_limit_ms (int): Time budget of one move in milliseconds.
+          max_depth (int): Deepest iteration to run if time allows.
+          tt (TranspositionTable): Table to use, a new one is created if not given. It is kept between moves.
+          book (OpeningBook): Optional opening book, positions found in it are not searched.
+          ordering (bool): Whether to order moves with killers, path gain and history. Without it only the
+                           transposition table move is tried first, which is useful to measure the gain.
+          """
+        self.time_limit = time_limit_ms / 1000
+        self.max_depth = max_depth
+        self.tt = tt if tt is not None else TranspositionTable()
+        self.book = book
+        self.ordering = ordering
+        self.killers = [[] for _ in range(MAX_PLY)]
+        self.history = {}  # Cutoff score of every move, kept between searches
+        self.interior_nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.killer_cutoffs = 0
+        self.deadline = INF
+        self.nodes = 0
+        self.depth_reached = 0
+        self.best_value = 0
+        self.principal_variation = []
+
+    def __call__(self, game):
+        """
+          Choose a move for the player on turn, used by easyAI's AI_Player.
+
+          Parameters:
+          game (QuoridorGame): The position to search. It is restored before returning.
+
+          Returns:
+          tuple: The chosen move, taken from the opening book when the position is in it.
+          """
+        if self.book is not None:
+            move = self.book.lookup(game)
+            if move is not None:
+                return move
+        return self.search(game)
+
+    def search(self, game):
+        """
+          Run iterative deepening until the time budget or the maximum depth is reached.
+
+          Parameters:
+          game (QuoridorGame): The position to search. It is restored before returning.
+
+          Returns:
+          tuple: The best move found.
+          """
+        self.deadline = time.perf_counter() + self.time_limit
+        return self.deepen(game)
+
+    def deepen(self, game):
+        """
+          Run iterative deepening until self.deadline (a time.perf_counter() value) or the maximum depth.
+
+          The deadline is read at every node, so another thread can move it while the search runs:
+          pulling it into the past cancels the search, pushing it out extends it.
+
+          Parameters:
+          game (QuoridorGame): The position to search. It is restored before returning.
+
+          Returns:
+          tuple: The best move found.
+          """
+        self.nodes = 0
+        self.depth_reached = 0
+        self.new_search()
+        self.interior_nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.killer_cutoffs = 0
+
+        move = self.solve_race(game)
+        if move is not None:
+            return move
+
+        moves = self.order_moves(game, game.possible_moves(), None, 0)
+        best_move = moves[0]
+        for depth in range(1, self.max_depth + 1):
+            # Principal variation first: the best move of the previous iteration
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+            completed = []
+            try:
+                value, move = self.search_root(game, moves, depth, completed)
+            except SearchTimeout:
+                # The first move is the previous best, so anything that beat it is at least as good
+                if completed:
+                    best_move = max(completed, key=lambda result: result[0])[1]
+                break
+            best_move = move
+            self.best_value = value
+            self.depth_reached = depth
+            self.principal_variation = self.extract_pv(game, best_move, depth)
+            if abs(value) >= WIN_SCORE - MAX_PLY:
+                break
+
+        return best_move
+
+    def new_search(self):
+        """
+          Age the tables kept between searches: start a new transposition table generation, so entries of
+          earlier searches no longer pin the depth-preferred slots, clear the killers and halve the history.
+          """
+        self.tt.new_search()
+        self.killers = [[] for _ in range(MAX_PLY)]
+        # Older cutoffs count less, so the history follows the game
+        self.history = {key: score // 2 for key, score in self.history.items() if score > 1}
+
+    def search_root(self, game, moves, depth, completed):
+        """
+          Search all root moves to the given depth.
+
+          Parameters:
+          game (QuoridorGame): The root position.
+          moves (list): The root moves, in search order.
+          depth (int): The depth of this iteration.
+          completed (list): Receives (value, move) of every root move searched to the end.
+
+          Returns:
+          tuple: (value, move) of the best root move.
+          """
+        alpha, beta = -INF, INF
+        best_value, best_move = -INF, moves[0]
+        for move in moves:
+            game.do_move(move)
+            try:
+                value = -self.negamax(game, depth - 1, -beta, -alpha, 1)
+            finally:
+                game.unmake_move(move)
+            completed.append((value, move))
+            if value > best_value:
+                best_value, best_move = value, move
+            if value > alpha:
+                alpha = value
+        self.tt.save(game.zobrist, depth, EXACT, best_value, best_move)
+        return best_value, best_move
+
+    def negamax(self, game, depth, alpha, beta, ply):
+        """
+          Alpha-beta search of a position, seen from the player on turn.
+
+          Parameters:
+          game (QuoridorGame): The position to search.
+          depth (int): Remaining depth.
+          alpha (float): Lower bound of the search window.
+          beta (float): Upper bound of the search window.
+          ply (int): Distance from the root, used to prefer faster wins.
+
+          Returns:
+          float: The value of the position.
+          """
+        # Nodes are expensive compared to reading the clock, so the budget is checked at every node
+        self.nodes += 1
+        if time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        if game.is_over():
+            # The player who just moved has reached their goal
+            return -(WIN_SCORE - ply)
+        race = game.solve_race()
+        if race is not None:
+            return race_value(game, race, ply)
+        if depth == 0:
+            return self.evaluate(game)
+
+        alpha_orig = alpha
+        key = game.zobrist
+        entry = self.tt.probe(key)
+        tt_move = None
+        if entry is not None:
+            tt_move = entry[4]
+            if entry[1] >= depth:
+                value = from_tt(entry[3], ply)
+                if entry[2] == EXACT:
+                    return value
+                elif entry[2] == LOWERBOUND:
+                    alpha = max(alpha, value)
+                elif entry[2] == UPPERBOUND:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        moves = game.possible_moves()
+        if not moves:
+            return self.evaluate(game)
+        moves = self.order_moves(game, moves, tt_move, ply)
+
+        self.interior_nodes += 1
+        best_value, best_move = -INF, moves[0]
+        for index, move in enumerate(moves):
+            game.do_move(move)
+            try:
+                value = -self.negamax(game, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                game.unmake_move(move)
+            if value > best_value:
+                best_value, best_move = value, move
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    self.record_cutoff(move, index, depth, ply)
+                    break
+
+        if best_value <= alpha_orig:
+            flag = UPPERBOUND
+        elif best_value >= beta:
+            flag = LOWERBOUND
+        else:
+            flag = EXACT
+        self.tt.save(key, depth, flag, to_tt(best_value, ply), best_move)
+        return best_value
+
+    def order_moves(self, game, moves, tt_move, ply):
+        """
+          Sort moves so the ones most likely to cause a cutoff are searched first.
+
+          Order: the transposition table move, the killer moves of this ply, then the rest by shortest-path
+          gain with the history score breaking ties.
+
+          Parameters:
+          game (QuoridorGame): The position.
+          moves (list): Its possible moves.
+          tt_move (tuple): Best move stored in the transposition table, or None.
+          ply (int): Distance from the root.
+
+          Returns:
+          list: The moves in search order.
+          """
+        if not self.ordering:
+            if tt_move is not None and tt_move in moves:
+                moves.remove(tt_move)
+                moves.insert(0, tt_move)
+            return moves
+
+        killers = self.killers[ply]
+        history = self.history
+
+        def rank(move):
+            key = move_key(move)
+            return move == tt_move, key in killers, game.move_gain(move), history.get(key, 0)
+
+        return sorted(moves, key=rank, reverse=True)
+
+    def record_cutoff(self, move, index, depth, ply):
+        """
+          Update the killer and history tables and the statistics after a beta cutoff.
+
+          Parameters:
+          move (tuple): The move that caused the cutoff.
+          index (int): Its position in the search order.
+          depth (int): Remaining depth of the node.
+          ply (int): Distance from the root.
+          """
+        key = move_key(move)
+        killers = self.killers[ply]
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+        if key in killers:
+            self.killer_cutoffs += 1
+        else:
+            killers.insert(0, key)
+            del killers[KILLERS_PER_PLY:]
+        self.history[key] = self.history.get(key, 0) + depth * depth
+
+    def ordering_stats(self):
+        """
+          Report how well the moves were ordered in the last search.
+
+          Returns:
+          dict: nodes, interior nodes, cutoffs, cutoff rate (cutoffs per interior node), first-move cutoff
+                rate (share of cutoffs caused by the first move searched) and killer cutoff rate
+                (share of cutoffs caused by a killer move).
+          """
+        return {
+            "nodes": self.nodes,
+            "interior_nodes": self.interior_nodes,
+            "cutoffs": self.cutoffs,
+            "cutoff_rate": self.cutoffs / self.interior_nodes if self.interior_nodes else 0.0,
+            "first_move_cutoff_rate": self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0,
+            "killer_cutoff_rate": self.killer_cutoffs / self.cutoffs if self.cutoffs else 0.0,
+        }
+
+    def solve_race(self, game):
+        """
+          Answer a root position that is a decided race without searching it.
+
+          Parameters:
+          game (QuoridorGame): The root position.
+
+          Returns:
+          tuple: A step along the shortest path, or None if the position has to be searched.
+          """
+        race = game.solve_race()
+        if race is None:
+            return None
+        move = game.race_move()
+        self.best_value = race_value(game, race, 0)
+        self.depth_reached = 0
+        self.principal_variation = [move]
+        return move
+
+    def evaluate(self, game):
+        """
+          Evaluate a position from the point of view of the player on turn.
+
+          Parameters:
+          game (QuoridorGame): The position to evaluate.
+
+          Returns:
+          float: The score, higher is better for the player on turn.
+          """
+        # QuoridorGame.scoring() rates positions for player 2
+        score = game.scoring()
+        return score if game.current_turn == 1 else -score
+
+    def extract_pv(self, game, first_move, depth):
+        """
+          Follow the best moves stored in the transposition table from the root.
+
+          Parameters:
+          game (QuoridorGame): The root position. It is restored before returning.
+          first_move (tuple): The best root move.
+          depth (int): Maximum length of the variation.
+
+          Returns:
+          list: The principal variation.
+          """
+        pv = [first_move]
+        game.do_move(first_move)
+        while len(pv) < depth and not game.is_over():
+            entry = self.tt.probe(game.zobrist)
+            if entry is None or entry[4] not in game.possible_moves():
+                break
+            pv.append(entry[4])
+            game.do_move(entry[4])
+        for move in reversed(pv):
+            game.unmake_move(move)
+        return pv
+
+
+def race_value(game, race, ply):
+    """
+      Score a solved race like a win or loss found by the search.
+
+      Parameters:
+      game (QuoridorGame): The position.
+      race (tuple): Result of game.solve_race().
+      ply (int): Distance of the position from the root.
+
+      Returns:
+      float: The value seen from the player on turn.
+      """
+    winner, plies = race
+    value = WIN_SCORE - (ply + plies)
+    return value if winner == game.current_turn else -value
+
+
+def to_tt(value, ply):
+    """
+      Convert a win score to be relative to the stored position instead of the root.
+
+      Parameters:
+      value (float): The value seen from the root.
+      ply (int): Distance of the position from the root.
+
+      Returns:
+      float: The value to store.
+      """
+    if value >= WIN_SCORE - MAX_PLY:
+        return value + ply
+    if value <= -WIN_SCORE + MAX_PLY:
+        return value - ply
+    return value
+
+
+def from_tt(value, ply):
+    """
+      Convert a stored win score back to be relative to the root.
+
+      Parameters:
+      value (float): The stored value.
+      ply (int): Distance of the position from the root.
+
+      Returns:
+      float: The value seen from the root.
+      """
+    if value >= WIN_SCORE - MAX_PLY:
+        return value - ply
+    if value <= -WIN_SCORE + MAX_PLY:
+        return value + ply
+    return value
+
+
+def init_worker(shared_bound):
+    """
+      Set up a root-parallel search worker process.
+
+      Parameters:
+      shared_bound (multiprocessing.Value): Best root value found so far by any worker in the current iteration.
+      """
+    global worker_searcher, worker_bound, worker_search_id
+    worker_searcher = AlphaBeta(time_limit_ms=INF)
+    worker_bound = shared_bound
+    worker_search_id = None
+
+
+def search_root_move(state, move, depth, deadline, search_id):
+    """
+      Search one root move in a worker process.
+
+      The search window starts at the best value already found for another root move, and a better value
+      is published for the other workers. The worker keeps its transposition table, killers and history
+      between the tasks of one search and ages them when the first task of a new search arrives, like
+      AlphaBeta.deepen does.
+
+      Parameters:
+      state (tuple): Snapshot of the root position.
+      move (tuple): The root move to search.
+      depth (int): Depth of the iteration, the root move included.
+      deadline (float): Wall-clock time (time.time()) at which the search must stop.
+      search_id (int): Number of the ParallelAlphaBeta search the task belongs to.
+
+      Returns:
+      tuple: (value, exact, CPU seconds spent), value is None if the deadline was reached and exact is False
+             when the value is only an upper bound below the shared bound.
+      """
+    global worker_search_id
+    started = time.time()
+    cpu_started = time.process_time()
+    if search_id != worker_search_id:
+        worker_searcher.new_search()
+        worker_search_id = search_id
+    game = QuoridorGame.from_snapshot(state)
+    worker_searcher.deadline = time.perf_counter() + (deadline - started)
+    alpha = worker_bound.value
+    game.do_move(move)
+    try:
+        value = -worker_searcher.negamax(game, depth - 1, -INF, -alpha, 1)
+    except SearchTimeout:
+        return None, False, time.process_time() - cpu_started
+    exact = value > alpha
+    if exact:
+        with worker_bound.get_lock():
+            if value > worker_bound.value:
+                worker_bound.value = value
+    return value, exact, time.process_time() - cpu_started
+
+
+class ParallelAlphaBeta(AlphaBeta):
+    """
+      Root-parallel alpha-beta: the root moves of each iteration are split across a process pool.
+
+      Workers search their subtrees with a shared lower bound and the results are merged by the parent.
+      After each search, speedup holds the summed worker CPU time divided by the wall time, an estimate
+      of the gain over a single process; benchmark_parallel() measures it against AlphaBeta directly.
+      """
+
+    def __init__(self, time_limit_ms=1000, max_depth=64, workers=None, book=None):
+        """
+          Create the searcher, the worker pool is started on the first search.
+
+          Parameters:
+          time_limit_ms (int): Time budget of one move in milliseconds.
+          max_depth (int): Deepest iteration to run if time allows.
+          workers (int): Number of worker processes, all CPUs if not given.
+          book (OpeningBook): Optional opening book, positions found in it are not searched.
+          """
+        super().__init__(time_limit_ms, max_depth, book=book)
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None
+        self.shared_bound = None
+        self.searches = 0  # Numbers the searches, so the workers know when to age their tables
+        self.speedup = 1.0
+
+    def start_pool(self):
+        """
+          Start the worker processes if they are not running yet.
+          """
+        if self.pool is None:
+            self.shared_bound = multiprocessing.Value('d', -INF)
+            self.pool = ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=(self.shared_bound,))
+
+    def close(self):
+        """
+          Shut the worker processes down.
+          """
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def search(self, game):
+        """
+          Run iterative deepening with every iteration's root moves searched in parallel.
+
+          Parameters:
+          game (QuoridorGame): The position to search. It is not modified.
+
+          Returns:
+          tuple: The best move found.
+          """
+        move = self.solve_race(game)
+        if move is not None:
+            return move
+
+        self.start_pool()
+        started = time.time()
+        deadline = started + self.time_limit
+        self.depth_reached = 0
+        self.searches += 1
+        worker_time = 0.0
+
+        state = game.snapshot()
+        moves = game.possible_moves()
+        best_move = moves[0]
+        for depth in range(1, self.max_depth + 1):
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+            self.shared_bound.value = -INF
+            futures = [self.pool.submit(search_root_move, state, move, depth, deadline, self.searches)
+                       for move in moves]
+            results = [future.result() for future in futures]
+            worker_time += sum(result[2] for result in results)
+
+            finished = [(value, move) for (value, exact, _), move in zip(results, moves) if value is not None]
+            exact = [(value, move) for (value, is_exact, _), move in zip(results, moves) if is_exact]
+            if len(finished) < len(moves):
+                # Only trust the interrupted iteration if the previous best move was searched to the end
+                if results[0][0] is not None and exact:
+                    best_move = max(exact, key=lambda result: result[0])[1]
+                break
+            value, best_move = max(exact or finished, key=lambda result: result[0])
+            self.best_value = value
+            self.depth_reached = depth
+            if abs(value) >= WIN_SCORE - MAX_PLY:
+                break
+
+        self.speedup = worker_time / max(time.time() - started, 1e-9)
+        return best_move
+
+
+def benchmark_parallel(game, depth, workers=None):
+    """
+      Compare a fixed-depth single-process search with the root-parallel one.
+
+      Parameters:
+      game (QuoridorGame): The position to search.
+      depth (int): Search depth of both searches.
+      workers (int): Number of worker processes, all CPUs if not given.
+
+      Returns:
+      dict: Wall times of both searches, their moves and the speedup.
+      """
+    serial = AlphaBeta(time_limit_ms=INF, max_depth=depth)
+    started = time.perf_counter()
+    serial_move = serial.search(game)
+    serial_time = time.perf_counter() - started
+
+    parallel = ParallelAlphaBeta(time_limit_ms=INF, max_depth=depth, workers=workers)
+    parallel.start_pool()
+    try:
+        started = time.perf_counter()
+        parallel_move = parallel.search(game)
+        parallel_time = time.perf_counter() - started
+    finally:
+        parallel.close()
+
+    return {
+        "depth": depth,
+        "workers": parallel.workers,
+        "serial_time": serial_time,
+        "parallel_time": parallel_time,
+        "speedup": serial_time / parallel_time,
+        "serial_move": serial_move,
+        "parallel_move": parallel_move,
+    }
+
+
+if __name__ == "__main__":
+    """
+    Measure the root-parallel speedup on the starting position.
+
+    Usage:
+        python search.py <depth> [<workers>]
+
+    Example:
+        python search.py 3 4
+    """
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python search.py <depth> [<workers>]")
+        sys.exit(1)
+
+    report = benchmark_parallel(QuoridorGame(), int(sys.argv[1]), int(sys.argv[2]) if len(sys.argv) == 3 else None)
+    print(f"Depth {report['depth']}, {report['workers']} workers: "
+          f"single process {report['serial_time']:.2f} s ({report['serial_move']}), "
+          f"parallel {report['parallel_time']:.2f} s ({report['parallel_move']}), "
+          f"speedup {report['speedup']:.2f}x")
@@ -0,0 +1,344 @@
+"""
+Asyncio server hosting many Quoridor games against the AI at once.
+
+Clients connect over TCP on localhost and exchange one JSON object per line. Every connection can run
+any number of games; the human always plays one side and the server answers every human move with
+the AI's reply. Searches run in a process pool, so a slow search only delays its own game while the
+event loop keeps serving the others.
+
+Requests and responses:
+    {"cmd": "new", "size": 9, "time_limit_ms": 100, "ai_first": false}
+        -> {"ok": true, "game": 1, "state": {...}, "ai_move": null}
+    {"cmd": "move", "game": 1, "move": ["MOVE", [4, 1]]}    (or ["WALL_HORIZONTAL", [3, 4]], ...)
+        -> {"ok": true, "game": 1, "state": {...}, "ai_move": ["MOVE", [4, 7]]}
+    {"cmd": "state", "game": 1}
+        -> {"ok": true, "game": 1, "state": {...}}
+    {"cmd": "close", "game": 1}
+        -> {"ok": true, "game": 1}
+    Errors are answered with {"ok": false, "error": "..."}.
+
+A state is {"pawns", "walls", "wall_counts", "turn", "over", "winner"}, with walls as [orientation, [x, y]].
+
+Finished games can be appended to a record file (see records.py) for analyze.py.
+
+Usage:
+    python server.py [<port>] [<workers>] [<records_file>]
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import QuoridorGame, GRID_SIZE, ORIENTATIONS
+from opening_book import open_book
+from records import write_records
+from search import AlphaBeta
+
+HOST = "127.0.0.1"
+PORT = 8765
+DEFAULT_TIME_LIMIT_MS = 100
+MAX_TIME_LIMIT_MS = 10000
+MAX_SIZE = 19
+
+# Per-process state of the search workers, set up by init_search_worker
+worker_searchers = {}
+worker_book = None
+
+
+def init_search_worker():
+    """
+      Open the opening book once in every worker process.
+      """
+    global worker_book
+    worker_book = open_book()
+
+
+def ai_move_task(state, time_limit_ms):
+    """
+      Choose the AI's move in a worker process.
+
+      The searcher of each time limit is kept in the worker, so its transposition table and history
+      are reused by the following searches.
+
+      Parameters:
+      state (tuple): Snapshot of the position.
+      time_limit_ms (int): Think time in milliseconds.
+
+      Returns:
+      tuple: The chosen move.
+      """
+    if time_limit_ms not in worker_searchers:
+        worker_searchers[time_limit_ms] = AlphaBeta(time_limit_ms=time_limit_ms, book=worker_book)
+    return worker_searchers[time_limit_ms](QuoridorGame.from_snapshot(state))
+
+
+def describe(game):
+    """
+      Describe a game for a client.
+
+      Parameters:
+      game (QuoridorGame): The game.
+
+      Returns:
+      dict: Pawns, walls, wall counts, player on turn, whether the game is over and the winner (player index).
+      """
+    over = game.is_over()
+    return {
+        "pawns": game.pawns,
+        "walls": [[orientation, list(position)] for orientation in ORIENTATIONS
+                  for position in game.walls[orientation]],
+        "wall_counts": game.wall_counts,
+        "turn": game.current_turn,
+        "over": over,
+        "winner": (0 if game.pawns[0][1] == game.size - 1 else 1) if over else None,
+    }
+
+
+class Session:
+    """
+      One game between a client and the AI.
+      """
+
+    def __init__(self, game, ai_player, time_limit_ms):
+        """
+          Create the session.
+
+          Parameters:
+          game (QuoridorGame): The game.
+          ai_player (int): Index of the player controlled by the AI.
+          time_limit_ms (int): Think time of the AI per move.
+          """
+        self.game = game
+        self.ai_player = ai_player
+        self.time_limit_ms = time_limit_ms
+        self.moves = []  # Moves played so far, for the game record
+        self.lock = asyncio.Lock()  # Moves of one game are handled one at a time
+
+
+class QuoridorServer:
+    """
+      Hosts the game sessions and hands AI searches to a process pool.
+      """
+
+    def __init__(self, workers=None, record_path=None):
+        """
+          Create the server, the process pool is started by start().
+
+          Parameters:
+          workers (int): Number of search processes, all CPUs if not given.
+          record_path (str): File to append finished games to, games are not recorded if not given.
+          """
+        self.workers = workers or os.cpu_count() or 1
+        self.record_path = record_path
+        self.pool = None
+        self.server = None
+        self.sessions = {}
+        self.game_ids = itertools.count(1)
+        self.moves_played = 0
+
+    async def start(self, host=HOST, port=PORT):
+        """
+          Start the process pool and listen for connections.
+
+          Parameters:
+          host (str): Address to listen on.
+          port (int): Port to listen on, 0 picks a free one.
+
+          Returns:
+          int: The port the server listens on.
+          """
+        self.pool = ProcessPoolExecutor(self.workers, initializer=init_search_worker)
+        self.server = await asyncio.start_server(self.handle_client, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """
+          Stop listening and shut the process pool down.
+          """
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def handle_client(self, reader, writer):
+        """
+          Serve one connection until the client disconnects.
+
+          Parameters:
+          reader (asyncio.StreamReader): Incoming lines.
+          writer (asyncio.StreamWriter): Outgoing lines.
+          """
+        owned = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = await self.handle_request(json.loads(line), owned)
+                except (ValueError, KeyError, TypeError) as error:
+                    response = {"ok": False, "error": f"bad request: {error}"}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for game_id in owned:
+                self.sessions.pop(game_id, None)
+            writer.close()
+
+    async def handle_request(self, request, owned):
+        """
+          Execute one request.
+
+          Parameters:
+          request (dict): The decoded request.
+          owned (set): Ids of the games created on this connection, only those can be played.
+
+          Returns:
+          dict: The response.
+          """
+        command = request["cmd"]
+        if command == "new":
+            return await self.new_game(request, owned)
+
+        game_id = request["game"]
+        if game_id not in owned:
+            return {"ok": False, "error": f"unknown game {game_id}"}
+        session = self.sessions[game_id]
+        if command == "move":
+            return await self.play_move(game_id, session, request["move"])
+        if command == "state":
+            return {"ok": True, "game": game_id, "state": describe(session.game)}
+        if command == "close":
+            owned.discard(game_id)
+            del self.sessions[game_id]
+            return {"ok": True, "game": game_id}
+        return {"ok": False, "error": f"unknown command {command}"}
+
+    async def new_game(self, request, owned):
+        """
+          Start a game, letting the AI move first if requested.
+
+          Parameters:
+          request (dict): The "new" request.
+          owned (set): Games of the connection, the new one is added.
+
+          Returns:
+          dict: The response with the game id and state.
+          """
+        size = int(request.get("size", GRID_SIZE))
+        if size % 2 == 0 or not 3 <= size <= MAX_SIZE:
+            return {"ok": False, "error": f"board size must be odd and between 3 and {MAX_SIZE}"}
+        time_limit_ms = min(max(int(request.get("time_limit_ms", DEFAULT_TIME_LIMIT_MS)), 1), MAX_TIME_LIMIT_MS)
+        game = QuoridorGame(size=size)
+        session = Session(game, 0 if request.get("ai_first") else 1, time_limit_ms)
+        game_id = next(self.game_ids)
+        self.sessions[game_id] = session
+        owned.add(game_id)
+
+        ai_move = None
+        if session.ai_player == 0:
+            async with session.lock:
+                ai_move = await self.ai_reply(session)
+        return {"ok": True, "game": game_id, "state": describe(game), "ai_move": ai_move}
+
+    async def play_move(self, game_id, session, move):
+        """
+          Play the client's move and answer with the AI's reply.
+
+          Parameters:
+          game_id (int): Id of the game.
+          session (Session): The game session.
+          move (list): [move type, [x, y]].
+
+          Returns:
+          dict: The response with the new state and the AI's move.
+          """
+        async with session.lock:
+            game = session.game
+            if game.is_over():
+                return {"ok": False, "error": "the game is over"}
+            if game.current_turn == session.ai_player:
+                return {"ok": False, "error": "not your turn"}
+
+            move_type, (x, y) = move
+            if move_type == "MOVE":
+                if [x, y] not in game.available_moves_from_position(game.pawns[game.current_turn]):
+                    return {"ok": False, "error": "illegal pawn move"}
+                game.do_move(("MOVE", [x, y]))
+                session.moves.append(("MOVE", [x, y]))
+            elif move_type in ("WALL_VERTICAL", "WALL_HORIZONTAL"):
+                if not game.place_wall((x, y), move_type[len("WALL_"):]):
+                    return {"ok": False, "error": "illegal wall"}
+                session.moves.append((move_type, (x, y)))
+            else:
+                return {"ok": False, "error": f"unknown move type {move_type}"}
+            self.moves_played += 1
+
+            ai_move = await self.ai_reply(session)
+            if game.is_over():
+                self.record(session)
+            return {"ok": True, "game": game_id, "state": describe(game), "ai_move": ai_move}
+
+    async def ai_reply(self, session):
+        """
+          Let the AI move if the game is not over, the search runs in the process pool.
+
+          Parameters:
+          session (Session): The game session, its lock must be held.
+
+          Returns:
+          list: The AI's move as [move type, [x, y]], or None if the game is over.
+          """
+        game = session.game
+        if game.is_over():
+            return None
+        loop = asyncio.get_running_loop()
+        move = await loop.run_in_executor(self.pool, ai_move_task, game.snapshot(), session.time_limit_ms)
+        game.do_move(move)
+        session.moves.append(move)
+        self.moves_played += 1
+        return [move[0], list(move[1])]
+
+    def record(self, session):
+        """
+          Append a finished game to the record file, if recording is enabled.
+
+          Parameters:
+          session (Session): The game session.
+          """
+        if self.record_path is not None:
+            write_records(self.record_path, [(session.game.size, session.moves)], append=True)
+
+
+async def serve(port=PORT, workers=None, record_path=None):
+    """
+      Run the server until it is interrupted.
+
+      Parameters:
+      port (int): Port to listen on.
+      workers (int): Number of search processes, all CPUs if not given.
+      record_path (str): File to append finished games to, optional.
+      """
+    server = QuoridorServer(workers, record_path)
+    port = await server.start(port=port)
+    print(f"Quoridor server listening on {HOST}:{port} with {server.workers} search processes")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve(int(sys.argv[1]) if len(sys.argv) > 1 else PORT,
+                          int(sys.argv[2]) if len(sys.argv) > 2 else None,
+                          sys.argv[3] if len(sys.argv) > 3 else None))
+    except KeyboardInterrupt:
+        pass
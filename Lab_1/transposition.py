@@ -0,0 +1,128 @@
+"""
+Bounded transposition table for the Quoridor AI.
+
+Positions are keyed by the Zobrist hash kept by QuoridorGame (pawns, walls, remaining wall counts and
+side to move). The table has a fixed number of buckets, each with two entries:
+    - a depth-preferred entry, only replaced by deeper searches or by entries of a newer search,
+    - an always-replace entry, which keeps the most recent result that did not fit the first one.
+
+The table follows the interface of easyAI's TranspositionTable (lookup / store with the same bound flags),
+so it can be passed to Negamax(depth, tt=table) and kept for the whole game.
+"""
+
+# Bound types, same values as in easyAI.AI.Negamax
+LOWERBOUND, EXACT, UPPERBOUND = -1, 0, 1
+
+
+class TranspositionTable:
+    """
+      Fixed-size hash table of search results with a two-tier replacement policy.
+      """
+
+    def __init__(self, size_bits=18):
+        """
+          Create an empty table.
+
+          Parameters:
+          size_bits (int): The table has 2 ** size_bits buckets of two entries each.
+          """
+        self.size = 1 << size_bits
+        self.mask = self.size - 1
+        # Entries are tuples (key, depth, flag, value, move, generation)
+        self.deep = [None] * self.size
+        self.recent = [None] * self.size
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def new_search(self):
+        """
+          Start a new search generation.
+
+          Entries from previous searches are kept and still used, but may be replaced by any new result.
+          """
+        self.generation += 1
+
+    def probe(self, key):
+        """
+          Find the entry stored for a position.
+
+          Parameters:
+          key (int): The Zobrist hash of the position.
+
+          Returns:
+          tuple: (key, depth, flag, value, move, generation), or None if the position is not stored.
+          """
+        index = key & self.mask
+        entry = self.deep[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        entry = self.recent[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def save(self, key, depth, flag, value, move):
+        """
+          Store a search result.
+
+          Parameters:
+          key (int): The Zobrist hash of the position.
+          depth (int): The remaining depth the position was searched to.
+          flag (int): EXACT, LOWERBOUND or UPPERBOUND.
+          value (float): The value found by the search.
+          move (tuple): The best move found in the position.
+          """
+        index = key & self.mask
+        entry = (key, depth, flag, value, move, self.generation)
+        deep = self.deep[index]
+        if deep is None or deep[0] == key or deep[5] != self.generation or depth >= deep[1]:
+            self.deep[index] = entry
+        else:
+            self.recent[index] = entry
+
+    def lookup(self, game):
+        """
+          Requests the entry of a game position, in the format used by easyAI's Negamax.
+
+          Parameters:
+          game (QuoridorGame): The position to look up.
+
+          Returns:
+          dict: The stored depth, value, move and flag, or None if the position is not stored.
+          """
+        entry = self.probe(game.ttentry())
+        if entry is None:
+            return None
+        return {"depth": entry[1], "flag": entry[2], "value": entry[3], "move": entry[4]}
+
+    def store(self, **data):
+        """
+          Stores an entry for a game position, called by easyAI's Negamax.
+
+          Parameters:
+          data (dict): game, depth, value, move and flag of the search result.
+          """
+        self.save(data["game"].ttentry(), data["depth"], data["flag"], data["value"], data["move"])
+
+    def clear(self):
+        """
+          Remove all entries, e.g. when a new game starts.
+          """
+        self.deep = [None] * self.size
+        self.recent = [None] * self.size
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        """
+          Count the stored entries.
+
+          Returns:
+          int: The number of occupied entries.
+          """
+        return sum(entry is not None for entry in self.deep) + sum(entry is not None for entry in self.recent)
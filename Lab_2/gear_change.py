@@ -1,4 +1,5 @@
 import sys
+import numpy as np
 from fuzzylogic.classes import Domain, Set, Rule
 from fuzzylogic.functions import R, S, triangular, trapezoid
 
@@ -16,6 +17,8 @@ Key variables:
     - gear (Domain): Defines the range and fuzzy sets representing gears (1-5).
     - rules (list of Rule): Contains the fuzzy logic rules mapping speed, engine load, 
       and throttle position to a recommended gear.
+    - set_shapes (dict): Shape function and parameters of every input set, used by
+      calculate_gears() to evaluate the sets on whole NumPy arrays.
 
 Each rule evaluates the current conditions and determines the gear that most closely 
 matches the given inputs based on fuzzy membership values.
@@ -26,17 +29,34 @@ engine_load = Domain("engine_load", 0, 100)
 throttle_position = Domain("throttle_position", 0, 100)
 gear = Domain("gear", 1, 5)
 
-speed.slow = trapezoid(0, 5, 20, 40)
-speed.medium = triangular(40, 90)
-speed.fast = trapezoid(70, 90, 240, 250)
+set_shapes = {}
 
-engine_load.low = trapezoid(0, 5, 20, 40)
-engine_load.medium = triangular(30, 70)
-engine_load.high = trapezoid(60, 80, 95, 100)
+def shaped_set(shape, *parameters):
+    """
+    Creates an input set and records its shape for the vectorized batch path.
+
+    Parameters:
+        shape (function): The fuzzylogic membership function, trapezoid or triangular.
+        *parameters (float): The parameters of the shape.
+
+    Returns:
+        Set: The fuzzy set, registered in set_shapes.
+    """
+    fuzzy_set = Set(shape(*parameters))
+    set_shapes[fuzzy_set] = (shape, parameters)
+    return fuzzy_set
+
+speed.slow = shaped_set(trapezoid, 0, 5, 20, 40)
+speed.medium = shaped_set(triangular, 40, 90)
+speed.fast = shaped_set(trapezoid, 70, 90, 240, 250)
+
+engine_load.low = shaped_set(trapezoid, 0, 5, 20, 40)
+engine_load.medium = shaped_set(triangular, 30, 70)
+engine_load.high = shaped_set(trapezoid, 60, 80, 95, 100)
 
-throttle_position.low = trapezoid(0, 5, 20, 40)
-throttle_position.medium = triangular(20, 70)
-throttle_position.high = trapezoid(60, 80, 95, 100)
+throttle_position.low = shaped_set(trapezoid, 0, 5, 20, 40)
+throttle_position.medium = shaped_set(triangular, 20, 70)
+throttle_position.high = shaped_set(trapezoid, 60, 80, 95, 100)
 
 gear.first = Set(R(0, 10))
 gear.second = Set(S(5, 30)) & Set(R(30, 45))
@@ -44,6 +64,8 @@ gear.third = Set(S(25, 50)) & Set(R(50, 65))
 gear.fourth = Set(S(45, 70)) & Set(R(65, 85))
 gear.fifth = Set(S(75, 90))
 
+domain_order = {speed: 0, engine_load: 1, throttle_position: 2}
+
 rules = [
     Rule({(speed.slow, engine_load.low, throttle_position.low): gear.first}),
     Rule({(speed.slow, engine_load.medium, throttle_position.low): gear.first}),
@@ -78,7 +100,7 @@ def calculate_gear(current_speed, current_engine_load, current_throttle_position
     Variables:
         gear_memberships (dict): Stores the calculated membership value for each gear.
         rule (Rule): Each fuzzy rule applied to the input conditions.
-        condition (tuple): The conditions in a rule (speed, engine load, throttle position).
+        condition (frozenset): The conditions in a rule (speed, engine load, throttle position).
         target_gear (Set): The gear suggested by the rule.
         combined_membership (float): The highest membership value for the evaluated conditions.
 
@@ -89,7 +111,8 @@ def calculate_gear(current_speed, current_engine_load, current_throttle_position
 
     for rule in rules:
         condition, target_gear = list(rule.conditions.items())[0]
-        speed_condition, load_condition, throttle_condition = condition
+        # Rule stores the condition as a frozenset, so each set is matched to its input by domain
+        speed_condition, load_condition, throttle_condition = sorted(condition, key=lambda s: domain_order[s.domain])
 
         speed_membership = speed_condition(current_speed)
         load_membership = load_condition(current_engine_load)
@@ -120,6 +143,139 @@ def calculate_gear(current_speed, current_engine_load, current_throttle_position
     selected_gear = max(gear_memberships, key=gear_memberships.get)
     return selected_gear
 
+def bounded_linear_array(values, low, high, inverse=False):
+    """
+    Evaluates fuzzylogic's bounded_linear(low, high) on an array, with the same arithmetic.
+
+    Parameters:
+        values (numpy.ndarray): The input values.
+        low (float): Input value where the line leaves 0 (or 1 when inverse).
+        high (float): Input value where the line reaches 1 (or 0 when inverse).
+        inverse (bool): Whether the line falls instead of rising.
+
+    Returns:
+        numpy.ndarray: The memberships, clipped to [0, 1].
+    """
+    c_m, no_m = (0, 1) if inverse else (1, 0)
+    gradient = (c_m - no_m) / (high - low)
+    return np.clip(gradient * (values - low) + no_m, 0., 1.)
+
+def triangular_array(values, low, high):
+    """
+    Evaluates fuzzylogic's triangular(low, high) on an array.
+
+    Parameters:
+        values (numpy.ndarray): The input values.
+        low (float): Left end of the triangle.
+        high (float): Right end of the triangle.
+
+    Returns:
+        numpy.ndarray: The memberships.
+    """
+    c = (low + high) / 2.
+    left_slope = bounded_linear_array(values, low, c)
+    right_slope = 1 - bounded_linear_array(values, c, high)
+    return np.where(values <= c, left_slope, right_slope)
+
+def trapezoid_array(values, low, c_low, c_high, high):
+    """
+    Evaluates fuzzylogic's trapezoid(low, c_low, c_high, high) on an array.
+
+    Parameters:
+        values (numpy.ndarray): The input values.
+        low (float): Left end of the trapezoid.
+        c_low (float): Start of the plateau.
+        c_high (float): End of the plateau.
+        high (float): Right end of the trapezoid.
+
+    Returns:
+        numpy.ndarray: The memberships.
+    """
+    left_slope = bounded_linear_array(values, low, c_low)
+    right_slope = bounded_linear_array(values, c_high, high, inverse=True)
+    return np.select(
+        [(values < low) | (high < values), values < c_low, values > c_high],
+        [0., left_slope, right_slope],
+        1.,
+    )
+
+array_shapes = {trapezoid: trapezoid_array, triangular: triangular_array}
+
+def set_memberships(fuzzy_set, values):
+    """
+    Evaluates an input set on an array of values.
+
+    Parameters:
+        fuzzy_set (Set): One of the input sets created with shaped_set().
+        values (numpy.ndarray): The input values.
+
+    Returns:
+        numpy.ndarray: The memberships, equal to calling the set on every value.
+    """
+    shape, parameters = set_shapes[fuzzy_set]
+    return array_shapes[shape](values, *parameters)
+
+def calculate_gears(speeds, engine_loads=None, throttle_positions=None):
+    """
+    Determines the recommended gears of many samples at once.
+
+    Vectorized version of calculate_gear(): every set and rule is evaluated on whole arrays,
+    and the results are the same as calling calculate_gear() on each sample, including the
+    choice of the earlier gear in the rules when two gears have the same membership.
+
+    Parameters:
+        speeds (array-like or DataFrame): The speeds in km/h, or a DataFrame with
+            speed, engine_load and throttle_position columns.
+        engine_loads (array-like): The engine loads as percentages, None with a DataFrame.
+        throttle_positions (array-like): The throttle positions as percentages, None with a DataFrame.
+
+    Raises:
+        ValueError: If only one of engine_loads and throttle_positions is given.
+
+    Returns:
+        tuple: (gears, strengths, gear_memberships) where gears (numpy.ndarray of str) holds the
+        recommended gear of every sample, e.g. "gear.third", strengths (numpy.ndarray) its membership
+        degree, and gear_memberships (dict) maps every gear Set to the array of its memberships.
+
+    Example usage:
+        gears, strengths, _ = calculate_gears([45, 120], [60, 50], [30, 40])
+    """
+    if (engine_loads is None) != (throttle_positions is None):
+        raise ValueError("Give both engine_loads and throttle_positions, or a table with all three inputs")
+    if engine_loads is None:
+        telemetry = speeds
+        speeds = telemetry["speed"]
+        engine_loads = telemetry["engine_load"]
+        throttle_positions = telemetry["throttle_position"]
+
+    inputs = {
+        speed: np.asarray(speeds, dtype=float),
+        engine_load: np.asarray(engine_loads, dtype=float),
+        throttle_position: np.asarray(throttle_positions, dtype=float),
+    }
+    memberships = {}
+    gear_memberships = {}
+
+    for rule in rules:
+        condition, target_gear = list(rule.conditions.items())[0]
+        for fuzzy_set in condition:
+            if fuzzy_set not in memberships:
+                memberships[fuzzy_set] = set_memberships(fuzzy_set, inputs[fuzzy_set.domain])
+
+        combined_membership = np.maximum.reduce([memberships[fuzzy_set] for fuzzy_set in condition])
+
+        if target_gear not in gear_memberships:
+            gear_memberships[target_gear] = combined_membership
+        else:
+            gear_memberships[target_gear] = np.maximum(gear_memberships[target_gear], combined_membership)
+
+    # argmax takes the first of equal memberships, like max() over the dict in calculate_gear()
+    gear_labels = np.array([str(target_gear) for target_gear in gear_memberships])
+    stacked = np.stack(list(gear_memberships.values()))
+    selected = np.argmax(stacked, axis=0)
+    strengths = np.take_along_axis(stacked, selected[np.newaxis], axis=0)[0]
+    return gear_labels[selected], strengths, gear_memberships
+
 if __name__ == "__main__":
     """
     Main entry point for calculating the gear recommendation based on user input.